@@ -6,16 +6,98 @@ from __future__ import annotations
 import math
 import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from utils.logger import get_logger
+from utils.jit import NUMBA_AVAILABLE, njit
+from acquisition.scheduler import ScheduledJob, scheduler
 from processing.sync_controller import sync_manager as SYNC
 
 logger = get_logger(__name__)
 
+# ====== SINE LOOKUP TABLE ======
+# Power-of-two phase space indexed by a fixed-point phase accumulator (DDS style):
+# the top _LUT_BITS of the phase select the entry, the fractional bits keep
+# fine frequency resolution without any per-sample transcendental call.
+_LUT_BITS = 12
+_LUT_SIZE = 1 << _LUT_BITS                               # 4096 phase steps (~-72 dB noise)
+_PHASE_FRAC_BITS = 16                                    # Sub-entry phase resolution
+_PHASE_MASK = (_LUT_SIZE << _PHASE_FRAC_BITS) - 1        # Wrap mask for one full cycle
+
+# Only the first quadrant is stored (sine symmetry); Q+1 entries cover [0, pi/2].
+_QUAD_BITS = _LUT_BITS - 2
+_QUAD_SIZE = 1 << _QUAD_BITS                             # 1024 steps per quadrant
+_QUAD_MASK = _QUAD_SIZE - 1
+_QSINE = np.sin(0.5 * np.pi * np.arange(_QUAD_SIZE + 1) / _QUAD_SIZE)
+# Per-quadrant sign/base/step: value = sign * _QSINE[base + step * (index & _QUAD_MASK)].
+_QUAD_SIGN = np.array([1.0, 1.0, -1.0, -1.0])            # Lower half positive, upper negative
+_QUAD_BASE = np.array([0, _QUAD_SIZE, 0, _QUAD_SIZE])    # Mirrored quadrants read backwards
+_QUAD_STEP = np.array([1, -1, 1, -1])
+
+# ====== BLOCK EMISSION ======
+_BLOCK_RATE_HZ = 50.0                                    # Target wakeups/s; block = ceil(fs / rate)
+_MOD_SEQ_MAX = 1 << 20                                   # Cap on precomputed modulation period
+
+
+def _lut_sine(phase_acc: np.ndarray) -> np.ndarray:
+    """Vectorized quarter-table sine for fixed-point phase accumulators."""
+    idx = phase_acc >> _PHASE_FRAC_BITS
+    quad = idx >> _QUAD_BITS
+    return _QUAD_SIGN[quad] * _QSINE[_QUAD_BASE[quad] + _QUAD_STEP[quad] * (idx & _QUAD_MASK)]
+
+
+def _triangle_seq(lo: float, hi: float, step: float, start: float) -> Tuple[np.ndarray, int]:
+    """Return one period of a lo↔hi triangle sweep and the index closest to start (rising)."""
+    span = hi - lo
+    if step <= 0.0 or span <= 0.0:
+        return np.array([start]), 0  # Modulation disabled: constant sequence
+    steps = min(max(1, math.ceil(span / step)), _MOD_SEQ_MAX // 2)
+    up = np.linspace(lo, hi, steps + 1)
+    seq = np.concatenate([up, up[-2:0:-1]])  # Endpoints appear once per period
+    start_idx = int(round((min(max(start, lo), hi) - lo) / span * steps))
+    return seq, start_idx
+
+
+@njit(cache=True, nogil=True)
+def _gen_block(ch1_acc, ch1_inc, ch2_acc, amp_seq, amp_pos, inc2_seq, inc2_pos, n, out_ch1, out_ch2):
+    """JIT kernel: fill n samples of both channels and return the updated phase accumulators."""
+    amp_len = amp_seq.shape[0]
+    inc2_len = inc2_seq.shape[0]
+    for i in range(n):
+        # ch_1: read then advance (fixed increment)
+        idx = ch1_acc >> _PHASE_FRAC_BITS
+        q = idx >> _QUAD_BITS
+        amp = amp_seq[(amp_pos + i) % amp_len]
+        out_ch1[i] = amp * _QUAD_SIGN[q] * _QSINE[_QUAD_BASE[q] + _QUAD_STEP[q] * (idx & _QUAD_MASK)]
+        ch1_acc = (ch1_acc + ch1_inc) & _PHASE_MASK
 
-class _SineWaveThread(threading.Thread):
-    """Background producer emitting two sine channels with slow modulation."""
+        # ch_2: advance by the current sweep increment then read
+        ch2_acc = (ch2_acc + inc2_seq[(inc2_pos + i) % inc2_len]) & _PHASE_MASK
+        idx = ch2_acc >> _PHASE_FRAC_BITS
+        q = idx >> _QUAD_BITS
+        out_ch2[i] = _QUAD_SIGN[q] * _QSINE[_QUAD_BASE[q] + _QUAD_STEP[q] * (idx & _QUAD_MASK)]
+    return ch1_acc, ch2_acc
+
+
+_KERNEL_WARM = False
+
+
+def _warm_kernel() -> None:
+    """Trigger the first JIT compile (or cache load) off the emission path."""
+    global _KERNEL_WARM
+    if _KERNEL_WARM or not NUMBA_AVAILABLE:
+        return
+    t0 = time.monotonic()
+    scratch = np.empty(1)
+    _gen_block(0, 1, 0, np.ones(1), 0, np.ones(1, dtype=np.int64), 0, 1, scratch, scratch)
+    _KERNEL_WARM = True
+    logger.info("demo_rand: JIT kernel ready in %.2fs", time.monotonic() - t0)
+
+
+class _SineWaveThread:
+    """Producer emitting two sine channels with slow modulation (runs on the shared scheduler)."""
 
     def __init__(
         self,
@@ -33,7 +115,6 @@ class _SineWaveThread(threading.Thread):
         enable_ch2: bool,
         stop_evt: Optional[threading.Event] = None,
     ) -> None:
-        super().__init__(name=f"DemoSine[{device_name}]", daemon=True)
         # Store device identity and normalized configuration knobs.
         self.device_name = device_name
         self.emission_freq_hz = float(emission_freq_hz)
@@ -44,6 +125,7 @@ class _SineWaveThread(threading.Thread):
         self.enable_ch1 = bool(enable_ch1)
         self.enable_ch2 = bool(enable_ch2)
         self._stop_evt = stop_evt or threading.Event()
+        self._job: Optional[ScheduledJob] = None
 
         # Maintain exact timing to preserve the requested emission cadence.
         self._period = 1.0 / self.emission_freq_hz if self.emission_freq_hz > 0.0 else 0.0
@@ -72,7 +154,6 @@ class _SineWaveThread(threading.Thread):
         rate_ratio = self.signal_freq_hz / max(self.emission_freq_hz, 1.0)
         amp_step = 0.1 * rate_ratio * self.amp_rate_scale * max(self._amp_range, 1e-6)
         self._amp_step = min(max(amp_step, 0.0), self._amp_range)
-        self._amp_direction = 1.0 if self._amp_range > 0.0 and self._amp_step > 0.0 else 0.0
 
         # Derive frequency sweep guards relative to the nominal tone.
         base_freq = max(self.signal_freq_hz, 0.1)
@@ -88,69 +169,140 @@ class _SineWaveThread(threading.Thread):
         # Frequency modulation step scales with requested rate and span.
         freq_step = 0.05 * base_freq * self.freq_rate_scale
         self._freq_step = min(max(freq_step, 0.0), self._freq_range)
-        self._freq_direction = 1.0 if self._freq_range > 0.0 and self._freq_step > 0.0 else 0.0
-        self._phase_ch2 = 0.0
 
-    def run(self) -> None:
+        # Integer phase accumulators; increments are cycles/sample in LUT fixed point.
+        self._phase_scale = (
+            (_LUT_SIZE << _PHASE_FRAC_BITS) / self.emission_freq_hz if self.emission_freq_hz > 0.0 else 0.0
+        )
+        self._ch1_phase_inc = int(round(self.signal_freq_hz * self._phase_scale)) & _PHASE_MASK
+        self._ch1_phase_acc = 0
+        self._ch2_phase_acc = 0
+
+        # Precomputed modulation periods indexed by sample: no per-sample direction/clamp logic.
+        self._amp_seq, self._amp_seq_off = _triangle_seq(
+            self._amp_min, self._amp_max, self._amp_step, self._amp
+        )
+        freq_seq, self._inc2_seq_off = _triangle_seq(
+            self._freq_min, self._freq_max, self._freq_step, self._freq
+        )
+        # ch_2 consumes the sweep as fixed-point phase increments directly.
+        self._inc2_seq = np.rint(freq_seq * self._phase_scale).astype(np.int64) & _PHASE_MASK
+
+        # Samples generated per wakeup; keeps the wake rate near _BLOCK_RATE_HZ.
+        self._block = max(1, math.ceil(self.emission_freq_hz / _BLOCK_RATE_HZ))
+        self._block_steps = np.arange(self._block, dtype=np.int64)
+        self._block_span = (self._block - 1) * self._period            # First→last sample in a block
+        self._ts_offsets = (self._block_steps * self._period).tolist()  # Per-sample ts offsets
+        self._out_ch1 = np.empty(self._block)
+        self._out_ch2 = np.empty(self._block)
+        self._fill_block = self._fill_block_jit if NUMBA_AVAILABLE else self._fill_block_numpy
+
+        # Bind the sink once and pick the packet shape now: no per-sample branching or list building.
+        self._enqueue = SYNC.enqueue_packet_fast
+        if self.enable_ch1 and self.enable_ch2:
+            self._emit = self._emit_both
+        elif self.enable_ch1:
+            self._emit = self._emit_ch1
+        else:
+            self._emit = self._emit_ch2
+
+    def start(self) -> None:
+        """Register the block tick with the shared scheduler."""
         if self._period <= 0.0:
             logger.warning("demo_rand '%s': non-positive FS, nothing to emit", self.device_name)
             return
+        if not (self.enable_ch1 or self.enable_ch2):
+            logger.warning("demo_rand '%s': no channels enabled, nothing to emit", self.device_name)
+            return
+        self._job = scheduler.schedule(
+            f"DemoSine[{self.device_name}]", self.tick, self._next_emit + self._block_span
+        )
+
+    def tick(self, now: float) -> Optional[float]:
+        """Emit one block once its last sample is due; return the next block deadline."""
+        if self._stop_evt.is_set():
+            return None
+        period, block_span = self._period, self._block_span
+        due = self._next_emit + block_span
+        if now < due:
+            return due  # Early wakeup: keep the deadline
+        if now - due > period:
+            # Fell behind (GC pause, host suspend): jump to the current slot, no burst.
+            self._skip_samples(int((now - due) / period))
+
+        n = self._block
+        ch1, ch2 = self._fill_block(n)
+
+        # Emit one packet per sample, stamped on the nominal sample grid.
+        self._emit(self._start_ts + self._sample_idx * period, ch1, ch2)
+
+        self._sample_idx += n
+        self._next_emit += n * period
+        return self._next_emit + block_span
+
+    # --- Emitters specialized at init on the enabled channel set ---
+    def _emit_both(self, base_ts: float, ch1: List[float], ch2: List[float]) -> None:
+        enqueue, name = self._enqueue, self.device_name
+        for off, v1, v2 in zip(self._ts_offsets, ch1, ch2):
+            enqueue(base_ts + off, name, (("ch_1", v1), ("ch_2", v2)))
+
+    def _emit_ch1(self, base_ts: float, ch1: List[float], _ch2: None) -> None:
+        enqueue, name = self._enqueue, self.device_name
+        for off, v1 in zip(self._ts_offsets, ch1):
+            enqueue(base_ts + off, name, (("ch_1", v1),))
+
+    def _emit_ch2(self, base_ts: float, _ch1: None, ch2: List[float]) -> None:
+        enqueue, name = self._enqueue, self.device_name
+        for off, v2 in zip(self._ts_offsets, ch2):
+            enqueue(base_ts + off, name, (("ch_2", v2),))
+
+    def _skip_samples(self, k: int) -> None:
+        """Advance the sample grid and phases by k samples without emitting them."""
+        inc2 = int(self._inc2_seq[(self._inc2_seq_off + self._sample_idx) % len(self._inc2_seq)])
+        self._sample_idx += k
+        self._next_emit += k * self._period
+        self._ch1_phase_acc = (self._ch1_phase_acc + self._ch1_phase_inc * k) & _PHASE_MASK
+        self._ch2_phase_acc = (self._ch2_phase_acc + inc2 * k) & _PHASE_MASK
+        logger.debug("demo_rand '%s': behind schedule, skipped %d sample(s)", self.device_name, k)
+
+    def _fill_block_jit(self, n: int) -> Tuple[Optional[List[float]], Optional[List[float]]]:
+        """Generate n samples with the compiled kernel (numba available)."""
+        self._ch1_phase_acc, self._ch2_phase_acc = _gen_block(
+            self._ch1_phase_acc, self._ch1_phase_inc, self._ch2_phase_acc,
+            self._amp_seq, (self._amp_seq_off + self._sample_idx) % len(self._amp_seq),
+            self._inc2_seq, (self._inc2_seq_off + self._sample_idx) % len(self._inc2_seq),
+            n, self._out_ch1, self._out_ch2,
+        )
+        ch1 = self._out_ch1[:n].tolist() if self.enable_ch1 else None
+        ch2 = self._out_ch2[:n].tolist() if self.enable_ch2 else None
+        return ch1, ch2
+
+    def _fill_block_numpy(self, n: int) -> Tuple[Optional[List[float]], Optional[List[float]]]:
+        """Generate n samples with vectorized LUT gathers (fallback without numba)."""
+        steps = self._block_steps[:n] + self._sample_idx
+
+        # ch_1: fixed tone, amplitude modulated; phase advances by a constant step.
+        ch1 = None
+        if self.enable_ch1:
+            amps = self._amp_seq[(steps + self._amp_seq_off) % len(self._amp_seq)]
+            acc1 = (self._ch1_phase_acc + self._ch1_phase_inc * self._block_steps[:n]) & _PHASE_MASK
+            ch1 = (amps * _lut_sine(acc1)).tolist()
+        self._ch1_phase_acc = (self._ch1_phase_acc + self._ch1_phase_inc * n) & _PHASE_MASK
 
-        while not self._stop_evt.is_set():
-            # Pace the loop so emission jitter stays bounded.
-            now = time.monotonic()
-            if now < self._next_emit:
-                time.sleep(min(self._next_emit - now, 0.05))
-                continue
-
-            # Compute current sample values using elapsed time since start.
-            elapsed = self._sample_idx * self._period
-            ch1_value = self._amp * math.sin(2.0 * math.pi * self.signal_freq_hz * elapsed)
-            device_ts = self._start_ts + elapsed
-
-            pairs = []
-            if self.enable_ch1:
-                # ch_1 reports amplitude modulation applied to the base tone.
-                pairs.append(("ch_1", ch1_value))
-
-            if self.enable_ch2:
-                # Phase accumulation preserves continuity for ch_2 frequency sweep.
-                self._phase_ch2 += 2.0 * math.pi * self._freq * self._period
-                self._phase_ch2 = math.fmod(self._phase_ch2, 2.0 * math.pi)
-                value_ch2 = math.sin(self._phase_ch2)
-                pairs.append(("ch_2", value_ch2))
-
-            if pairs:
-                # Emit packet containing enabled channel samples for this tick.
-                SYNC.enqueue_packet(
-                    device_ts=device_ts,
-                    device_name=self.device_name,
-                    channel_pairs=tuple(pairs),
-                )
-
-            self._sample_idx += 1
-            self._next_emit += self._period
-            if self._amp_step > 0.0 and self._amp_direction != 0.0:
-                self._amp += self._amp_direction * self._amp_step
-                if self._amp >= self._amp_max:
-                    self._amp = self._amp_max
-                    self._amp_direction = -1.0
-                elif self._amp <= self._amp_min:
-                    self._amp = self._amp_min
-                    self._amp_direction = 1.0
-
-            if self.enable_ch2 and self._freq_step > 0.0 and self._freq_direction != 0.0:
-                self._freq += self._freq_direction * self._freq_step
-                if self._freq >= self._freq_max:
-                    self._freq = self._freq_max
-                    self._freq_direction = -1.0
-                elif self._freq <= self._freq_min:
-                    self._freq = self._freq_min
-                    self._freq_direction = 1.0
+        # ch_2: swept frequency; cumulative increments preserve phase continuity.
+        ch2 = None
+        if self.enable_ch2:
+            inc2 = self._inc2_seq[(steps + self._inc2_seq_off) % len(self._inc2_seq)]
+            acc2 = (self._ch2_phase_acc + np.cumsum(inc2)) & _PHASE_MASK
+            ch2 = _lut_sine(acc2).tolist()
+            self._ch2_phase_acc = int(acc2[-1])
+        return ch1, ch2
 
     def stop(self) -> None:
-        # Allow external callers to end the loop gracefully.
+        # Allow external callers to end the producer gracefully.
         self._stop_evt.set()
+        if self._job is not None:
+            self._job.cancel()
 
 
 class DemoRandManager:
@@ -183,11 +335,12 @@ class DemoRandManager:
         enable_ch1 = bool(chans.get("ch_1", True))
         enable_ch2 = bool(chans.get("ch_2", True))
         if not (enable_ch1 or enable_ch2):
-            # Avoid spinning up a thread when nothing would be emitted.
+            # Avoid scheduling a producer when nothing would be emitted.
             logger.info("demo_rand '%s': no channels enabled; skipping", self.name)
             return
+        _warm_kernel()  # Compile before the producer anchors its clock
 
-        # Spawn the background worker with the resolved configuration.
+        # Register the producer on the shared scheduler with the resolved configuration.
         self._thr = _SineWaveThread(
             device_name=self.name,
             emission_freq_hz=fs,
@@ -223,7 +376,7 @@ class DemoRandManager:
         )
 
     def stop(self) -> None:
-        # Signal the worker thread to terminate, if it exists.
+        # Signal the producer to stop, if it exists.
         thr = self._thr
         if thr is None:
             return
@@ -51,15 +51,15 @@ class _TemplateThread(threading.Thread):
         while not self._stop_evt.is_set():
             # --- Pace loop if a nominal FS is provided (optional) ---
             if self._period > 0.0:
-                now = time.monotonic()
-                sleep_s = self._next_tick - now
-                if sleep_s > 0.0:
-                    time.sleep(min(sleep_s, 0.05))
-                    continue
+                wait_s = self._next_tick - time.monotonic()
+                if wait_s > 0.0 and self._stop_evt.wait(wait_s):
+                    break  # Stop requested while waiting
                 self._next_tick += self._period
-            else:
-                # No cadence configured; avoid busy spin
-                time.sleep(0.05)
+                now = time.monotonic()
+                if now - self._next_tick > self._period:
+                    self._next_tick = now  # Far behind: resync instead of bursting
+            elif self._stop_evt.wait(0.05):
+                break  # No cadence configured; idle without busy spin
 
             # --- PLACEHOLDER: read from the physical/virtual device -----------
             # Example shape of a single-sample read (replace with real data):
@@ -74,10 +74,12 @@ class _TemplateThread(threading.Thread):
             #     (ch, values[ch]) for ch in self.enabled_channels if ch in values
             # )
             # if pairs:
-            #     SYNC.enqueue_packet(
-            #         device_ts=device_ts,                 # float seconds
-            #         device_name=self.device_name,        # e.g., "tpl_1"
-            #         channel_pairs=pairs,                 # (("tpl_ch1", v1), ...)
+            #     # Positional fast path (float ts, str name, tuple of pairs); use
+            #     # SYNC.enqueue_packet(...) instead if inputs need coercion.
+            #     SYNC.enqueue_packet_fast(
+            #         device_ts,                           # float seconds
+            #         self.device_name,                    # e.g., "tpl_1"
+            #         pairs,                               # (("tpl_ch1", v1), ...)
             #     )
 
             # --- OPTIONAL: emit markers ---
@@ -0,0 +1,34 @@
+# acquisition/handlers/_shimmer_common.py
+# Helpers shared by the Shimmer handler factories (GSR, PPG, EMG).
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from pyshimmer import DataPacket, EChannelType
+
+"""
+Channel-presence probing used by the handlers' "missing channel" warnings.
+Per packet, handlers read pkt[enum] inside a narrow try/except: only that
+lookup can fail (channel absent from the stream), so the decode after it
+stays straight-line.
+"""
+
+
+# ====== CHANNEL PROBING ======
+# Enum members are immutable: reflect once at import instead of per warning.
+ALL_CHANNEL_ENUMS: Tuple[Tuple[str, EChannelType], ...] = tuple(
+    (name, getattr(EChannelType, name)) for name in dir(EChannelType) if name.isupper()
+)
+
+
+def present_channels(pkt: DataPacket) -> List[str]:
+    """Return the EChannelType names available in this packet (best-effort)."""
+    out: List[str] = []
+    for name, ch in ALL_CHANNEL_ENUMS:
+        try:
+            _ = pkt[ch]                               # Probe access; raises if absent
+            out.append(name)
+        except Exception:
+            pass
+    return out
@@ -0,0 +1,53 @@
+# acquisition/handlers/_shimmer_config.py
+# Frozen snapshot of the global CONFIG values read by the Shimmer handler factories.
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from utils.config import CONFIG
+
+"""
+CONFIG is fully merged at import and not mutated afterwards, so the handler
+factories read this one snapshot instead of walking nested dicts on every
+build (multi-device startup, reconnects). Filter specs are stored as sorted
+item tuples: immutable and hashable; use dict(spec) where a mapping is needed.
+"""
+
+SpecItems = Tuple[Tuple[str, Any], ...]
+
+
+# ====== SNAPSHOT ======
+@dataclass(frozen=True)
+class ShimmerStaticCfg:
+    """Global (non-instance) Shimmer handler settings."""
+    telemetry_window_s: float     # telemetry.WINDOW_S
+    gsr_filter_spec: SpecItems    # devices.shimmer.FILTERS['gsr_uS']
+    ppg_filter_spec: SpecItems    # devices.shimmer.FILTERS['ppg_mV']
+    emg_filter_spec: SpecItems    # devices.shimmer.FILTERS['emg_uV']
+
+
+def _spec_items(filters: Dict[str, Any], name: str) -> SpecItems:
+    """Freeze one filter spec dict into sorted (key, value) pairs; {} if absent/invalid."""
+    try:
+        return tuple(sorted(dict(filters.get(name, {}) or {}).items()))
+    except Exception:
+        return ()
+
+
+def _load() -> ShimmerStaticCfg:
+    """Build the snapshot from CONFIG (missing or malformed nodes fall back to defaults)."""
+    try:
+        filters = dict(CONFIG.get("devices", {}).get("shimmer", {}).get("FILTERS", {}) or {})
+    except Exception:
+        filters = {}
+    return ShimmerStaticCfg(
+        telemetry_window_s=float(CONFIG.get("telemetry", {}).get("WINDOW_S", 10.0)),
+        gsr_filter_spec=_spec_items(filters, "gsr_uS"),
+        ppg_filter_spec=_spec_items(filters, "ppg_mV"),
+        emg_filter_spec=_spec_items(filters, "emg_uV"),
+    )
+
+
+SHIMMER_CFG = _load()
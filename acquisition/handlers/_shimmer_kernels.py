@@ -0,0 +1,62 @@
+# acquisition/handlers/_shimmer_kernels.py
+# Scalar decode kernels for Shimmer handlers (JIT when numba is available).
+
+from __future__ import annotations
+
+from typing import Tuple
+
+from utils.jit import NUMBA_AVAILABLE, njit
+
+"""
+Per-packet RAW→physical-unit conversions shared by the GSR and PPG handlers.
+Kernels take plain ints/floats and return floats, so they compile to a few
+native ops under numba and run unchanged as Python without it. No fastmath:
+results stay bit-identical between the two paths.
+"""
+
+
+# ====== CONSTANTS ======
+# Packed GSR word layout: 2 MSB = range code, 14 LSB = ADC (frozen into the JIT code)
+GSR_RANGE_SHIFT = 14
+GSR_RANGE_MASK = 0x03
+GSR_ADC_MASK = 0x3FFF
+ADC14_FULL_SCALE = 16383.0
+
+
+# ====== KERNELS ======
+@njit(cache=True, nogil=True)
+def _decode_gsr(gsr_raw, adc_to_v, v_bias, r_feedback):
+    """Packed GSR word → (µS, invalid); µS is NaN when invalid.
+
+    adc_to_v is VREF / 16383 (volts per count); r_feedback is a 4-tuple of
+    feedback resistors (Ohm) indexed by range code (always 0..3 after masking).
+    """
+    range_code = (gsr_raw >> GSR_RANGE_SHIFT) & GSR_RANGE_MASK
+    vin = (gsr_raw & GSR_ADC_MASK) * adc_to_v            # 14-bit ADC → input voltage
+    if 0.0 < vin < v_bias:                               # Valid only below bias
+        r_skin = r_feedback[range_code] * (v_bias / vin - 1.0)
+        return 1e6 / max(r_skin, 1e-12), False          # Conductance in µS
+    return float("nan"), True
+
+
+@njit(cache=True, nogil=True)
+def _decode_ppg(adc, vref, invert):
+    """14-bit PPG ADC → mV, optionally inverted."""
+    v_mv = (adc / ADC14_FULL_SCALE) * vref * 1000.0
+    if invert:
+        return -v_mv
+    return v_mv
+
+
+_KERNELS_WARM = False
+
+
+def _warm_kernels() -> None:
+    """Compile (or load from cache) the decode kernels before the first live packet."""
+    global _KERNELS_WARM
+    if _KERNELS_WARM or not NUMBA_AVAILABLE:
+        return
+    rfb: Tuple[float, float, float, float] = (1.0, 1.0, 1.0, 1.0)
+    _decode_gsr(0, 3.0 / ADC14_FULL_SCALE, 0.5, rfb)
+    _decode_ppg(0, 3.0, True)
+    _KERNELS_WARM = True
@@ -5,13 +5,14 @@ from __future__ import annotations
 from threading import Event
 from typing import Callable, Optional, List, Tuple, Union, Dict
 import math
+import sys
 
 from pyshimmer import DataPacket, EChannelType
 
 from utils.logger import get_logger
-from acquisition.shimmer_timebase import device_time_s
 from processing.rt_filter import StreamingSOS, design_sos
-from utils.config import CONFIG
+from acquisition.handlers._shimmer_common import present_channels
+from acquisition.handlers._shimmer_config import SHIMMER_CFG
 
 """
 Factory-based EMG handler.
@@ -22,22 +23,6 @@ logger = get_logger(__name__)
 
 ValueT = Optional[Union[float, int]]
 
-# ====== HELPERS ======
-def _present_channels(pkt: DataPacket) -> List[str]:
-    """Return available EChannelType names found in this packet."""
-    out: List[str] = []
-    for name in dir(EChannelType):
-        if not name.isupper():
-            continue  # Skip non-enum attributes
-        try:
-            ch = getattr(EChannelType, name)         # Resolve enum member
-            _ = pkt[ch]                               # Probe access; raises if absent
-            out.append(name)                          # Keep only present channels
-        except Exception:
-            pass                                       # Best-effort listing
-    return out
-
-
 # ====== FACTORY ======
 def build_emg_handler(
     *,
@@ -49,7 +34,7 @@ def build_emg_handler(
     want_emg2_raw: bool,
     want_emg1_flt: bool,
     want_emg2_flt: bool,
-) -> Callable[[DataPacket], List[Tuple[str, ValueT]]]:
+) -> Callable[[DataPacket, float, List[Tuple[str, ValueT]]], None]:
     """
     Return EMG handler emitting (channel, value|None) pairs.
 
@@ -76,10 +61,7 @@ def build_emg_handler(
     n_phys = min(2, len(emg_enums))  # Guard even if list longer
 
     # --- Filter spec (per-device block) for logical 'emg_uV' ---
-    try:
-        spec = dict(CONFIG.get("devices", {}).get("shimmer", {}).get("FILTERS", {}).get("emg_uV", {}))
-    except Exception:
-        spec = {}
+    spec = dict(SHIMMER_CFG.emg_filter_spec)
 
     # --- Build stateless SOS chain and per-instance streaming filter ---
     pipes: Dict[int, StreamingSOS] = {}
@@ -88,21 +70,22 @@ def build_emg_handler(
         pipes[i] = StreamingSOS(sos, context=f"{timebase_key}:emg{i}_uV")  # Independent state
 
     # --- Telemetry window/state ---
-    TELEMETRY_WINDOW_S = float(CONFIG.get("telemetry", {}).get("WINDOW_S", 10.0))
-    _invalid_count: Dict[int, int] = {i: 0 for i in range(1, 3)}
+    TELEMETRY_WINDOW_S = SHIMMER_CFG.telemetry_window_s
+    _invalid_count: List[int] = [0, 0, 0]             # Indexed by channel (1..2); slot 0 unused
     _last_telem_t0: Optional[float] = None
-    _warned_missing: Dict[int, bool] = {i: False for i in range(1, 3)}
+    _telem_due: float = -math.inf                      # Next window end; -inf anchors on first call
+    _warned_missing: List[bool] = [False, False, False]
 
     def _telemetry_update(t_s: float, ch_i: int, invalid: bool) -> None:
         """Aggregate invalids per channel; emit every TELEMETRY_WINDOW_S seconds."""
-        nonlocal _last_telem_t0
-        if _last_telem_t0 is None:
-            _last_telem_t0 = t_s
+        nonlocal _last_telem_t0, _telem_due
         if invalid:
             _invalid_count[ch_i] += 1
-        elapsed = t_s - _last_telem_t0
-        if elapsed >= TELEMETRY_WINDOW_S:
-            for j in range(1, 3):
+        if t_s < _telem_due:
+            return  # Inside the current window: one comparison
+        if _last_telem_t0 is not None:
+            elapsed = t_s - _last_telem_t0
+            for j in (1, 2):
                 cnt = _invalid_count[j]
                 if cnt > 0:
                     logger.warning(
@@ -110,40 +93,83 @@ def build_emg_handler(
                         timebase_key, j, cnt, elapsed
                     )
                     _invalid_count[j] = 0
-            _last_telem_t0 = t_s
+        _last_telem_t0 = t_s
+        _telem_due = t_s + TELEMETRY_WINDOW_S
 
-    def _counts_to_uV(enum_name: str, counts: int) -> float:
-        """Convert ADS1292R signed counts to microvolts (24/16-bit aware)."""
-        fs_code = 32767.0 if enum_name.endswith("16BIT") else 8388607.0  # ADC range
-        return (float(counts) / fs_code) * (VREF_EXG / EXG_GAIN) * 1e6    # µV
+    _isfinite = math.isfinite  # Bound once for the per-sample validation
 
-    # --- Channel processing helpers (reduce duplication) ---
-    def _process_ch(i: int, raw_flag: bool, flt_flag: bool, pkt: DataPacket, t_s: float,
-                    out: List[Tuple[str, ValueT]]) -> None:
-        """Read counts, convert to µV, push RAW/filtered; log gaps and missing."""
+    # --- Per-channel processors (enum, names and filter bound once at build time) ---
+    def _make_ch_proc(i: int, raw_flag: bool, flt_flag: bool
+                      ) -> Optional[Callable[[DataPacket, float, List[Tuple[str, ValueT]]], None]]:
+        """Return a processor for channel i, or None if not configured/requested."""
         enum = emg_enums.get(i)
-        if enum is None:
-            return  # Channel not configured
+        if enum is None or not (raw_flag or flt_flag):
+            return None  # Channel not configured or nothing to emit
         enum_name = getattr(enum, "name", str(enum))
-        try:
-            counts = int(pkt[enum])                       # Signed 24/16-bit
-            uV = _counts_to_uV(enum_name, counts)         # Counts→µV
-
-            if raw_flag:
-                out.append((f"RAW_emg{i}_uV", float(uV)))  # RAW
-
-            if flt_flag:
-                v_f = pipes[i].apply(float(uV))           # Filter chain
-                ok = isinstance(v_f, (float, int)) and math.isfinite(float(v_f))
-                out.append((f"emg{i}_uV", float(v_f) if ok else None))
-                if not ok:
-                    _telemetry_update(t_s, i, invalid=True)
-
-        except Exception:
+        pipe = pipes[i]
+        # ADS1292R counts→µV folded into one constant (24/16-bit full scale per enum)
+        fs_code = 32767.0 if enum_name.endswith("16BIT") else 8388607.0
+        uV_scale = (VREF_EXG / EXG_GAIN) * 1e6 / fs_code
+        # Names are built at runtime, so intern them: every packet shares one key object.
+        raw_key = sys.intern(f"RAW_emg{i}_uV")
+        flt_key = sys.intern(f"emg{i}_uV")
+
+        # One variant per flag combination, picked once here: no flag tests per packet.
+        # Default args bind build-time constants as fast locals (LOAD_FAST, not closure cells).
+        def _proc_raw(
+            pkt: DataPacket, t_s: float, out: List[Tuple[str, ValueT]],
+            _enum=enum, _scale=uV_scale, _raw_key=raw_key,
+        ) -> None:
+            """RAW only: read counts, convert to µV, push; log missing."""
+            try:
+                counts = int(pkt[_enum])                      # Signed 24/16-bit
+            except (KeyError, IndexError, TypeError, ValueError):
+                _on_missing(pkt, t_s)
+                return
+            out.append((_raw_key, counts * _scale))           # Counts→µV (float)
+
+        def _proc_flt(
+            pkt: DataPacket, t_s: float, out: List[Tuple[str, ValueT]],
+            _enum=enum, _scale=uV_scale, _flt_key=flt_key, _apply=pipe.apply, _isfinite=_isfinite,
+        ) -> None:
+            """Filtered only: read counts, convert to µV, filter, push; log gaps and missing."""
+            try:
+                counts = int(pkt[_enum])
+            except (KeyError, IndexError, TypeError, ValueError):
+                _on_missing(pkt, t_s)
+                return
+            v_f = _apply(counts * _scale)                     # float in → float out (fail-safe)
+            if _isfinite(v_f):
+                out.append((_flt_key, v_f))
+            else:
+                out.append((_flt_key, None))                  # Gap on non-finite output
+                _telemetry_update(t_s, i, invalid=True)
+
+        def _proc_both(
+            pkt: DataPacket, t_s: float, out: List[Tuple[str, ValueT]],
+            _enum=enum, _scale=uV_scale, _raw_key=raw_key, _flt_key=flt_key,
+            _apply=pipe.apply, _isfinite=_isfinite,
+        ) -> None:
+            """RAW + filtered: read counts once, push both; log gaps and missing."""
+            try:
+                counts = int(pkt[_enum])
+            except (KeyError, IndexError, TypeError, ValueError):
+                _on_missing(pkt, t_s)
+                return
+            uV = counts * _scale
+            out.append((_raw_key, uV))                        # RAW
+            v_f = _apply(uV)
+            if _isfinite(v_f):
+                out.append((_flt_key, v_f))
+            else:
+                out.append((_flt_key, None))
+                _telemetry_update(t_s, i, invalid=True)
+
+        def _on_missing(pkt: DataPacket, t_s: float) -> None:
+            """Cold path: warn once with a preview of present channels, count the gap."""
             if not _warned_missing[i]:
-                # Log once with a short preview of present channels
                 try:
-                    avail = _present_channels(pkt)[:20]   # Avoid huge logs
+                    avail = present_channels(pkt)[:20]        # Avoid huge logs
                     logger.warning("[EMG:%s] MISSING %s (ch%d) — available=%s",
                                    timebase_key, enum_name, i, avail)
                 except Exception:
@@ -151,19 +177,28 @@ def build_emg_handler(
                 _warned_missing[i] = True
             _telemetry_update(t_s, i, invalid=True)
 
-    # --- Handler closure ---
-    def handler(pkt: DataPacket) -> List[Tuple[str, ValueT]]:
-        """Process one packet and return enabled channel/value pairs."""
-        if stop_event.is_set():
-            return []  # Early exit on stop
-
-        t_s = device_time_s(pkt, key=timebase_key)        # Device-relative seconds
-        out: List[Tuple[str, ValueT]] = []
+        if raw_flag and flt_flag:
+            return _proc_both
+        return _proc_raw if raw_flag else _proc_flt
 
-        _process_ch(1, want_emg1_raw, want_emg1_flt, pkt, t_s, out)  # Channel 1
-        _process_ch(2, want_emg2_raw, want_emg2_flt, pkt, t_s, out)  # Channel 2
+    ch_procs = tuple(
+        proc for proc in (
+            _make_ch_proc(1, want_emg1_raw, want_emg1_flt),  # Channel 1
+            _make_ch_proc(2, want_emg2_raw, want_emg2_flt),  # Channel 2
+        ) if proc is not None
+    )
 
-        return out
+    # --- Handler closure ---
+    def handler(
+        pkt: DataPacket, t_s: float, out: List[Tuple[str, ValueT]],
+        _stopped=stop_event.is_set, _procs=ch_procs,
+    ) -> None:
+        """Process one packet (device-relative t_s from the caller); append enabled pairs to out."""
+        if _stopped():
+            return  # Early exit on stop
+
+        for proc in _procs:
+            proc(pkt, t_s, out)
 
     logger.info(
         "[EMG:%s] Handler ready (chs=%s, fs=%.1f Hz, Vref=%.3f V, gain=%.1f, flags={raw1:%s,raw2:%s,flt1:%s,flt2:%s})",
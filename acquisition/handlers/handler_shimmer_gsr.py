@@ -9,9 +9,10 @@ import math
 from pyshimmer import DataPacket, EChannelType
 
 from utils.logger import get_logger
-from acquisition.shimmer_timebase import device_time_s
+from acquisition.handlers._shimmer_kernels import ADC14_FULL_SCALE, _decode_gsr, _warm_kernels
 from processing.rt_filter import StreamingSOS, design_sos
-from utils.config import CONFIG
+from acquisition.handlers._shimmer_common import present_channels
+from acquisition.handlers._shimmer_config import SHIMMER_CFG
 
 """
 Factory-based GSR handler. Decodes Shimmer GSR RAW to µS, applies optional
@@ -22,7 +23,12 @@ logger = get_logger(__name__)
 
 ValueT = Optional[Union[float, int]]
 
-# Map of range bitfield to feedback resistor (Ohm)
+# Output channel names (constant literals: compiled once, interned, shared by every packet)
+_CH_RAW = "RAW_gsr_uS"
+_CH_FLT = "gsr_uS"
+_FLT_GAP = (_CH_FLT, None)  # Immutable gap pair reused for every invalid filtered sample
+
+# Map of range bitfield to feedback resistor (Ohm); the decode kernel indexes a tuple copy
 RFEEDBACK_MAP = {
     0: 40_200,
     1: 287_000,
@@ -31,22 +37,6 @@ RFEEDBACK_MAP = {
 }
 
 
-# ====== HELPERS ======
-def _present_channels(pkt: DataPacket) -> List[str]:
-    """Return available channel names in this packet (best-effort)."""
-    out: List[str] = []
-    for name in dir(EChannelType):
-        if not name.isupper():
-            continue
-        try:
-            ch = getattr(EChannelType, name)
-            _ = pkt[ch]  # Access to test presence
-            out.append(name)
-        except Exception:
-            pass
-    return out
-
-
 # ====== FACTORY ======
 def build_gsr_handler(
     *,
@@ -55,9 +45,9 @@ def build_gsr_handler(
     stop_event: Event,
     want_raw: bool,
     want_filtered: bool,
-) -> Callable[[DataPacket], List[Tuple[str, ValueT]]]:
+) -> Callable[[DataPacket, float, List[Tuple[str, ValueT]]], None]:
     """
-    Return a per-instance GSR handler that yields (channel, value|None) pairs.
+    Return a per-instance GSR handler that appends (channel, value|None) pairs to the caller's list.
 
     The handler:
     - Decodes Shimmer GSR RAW to µS (None if invalid).
@@ -71,104 +61,104 @@ def build_gsr_handler(
     FS_HZ    = float(handler_cfg.get("FS_HZ", 128.0))      # Sampling rate
 
     # --- Telemetry params (global) ---
-    TELEMETRY_WINDOW_S = float(CONFIG.get("telemetry", {}).get("WINDOW_S", 10.0))
+    TELEMETRY_WINDOW_S = SHIMMER_CFG.telemetry_window_s
 
-    # --- Filter spec (per-device block) ---
-    try:
-        shimmer_block = CONFIG.get("devices", {}).get("shimmer", {})
-        filters_block = shimmer_block.get("FILTERS", {})
-        gsr_spec = dict(filters_block.get("gsr_uS", {}))  # local copy
-    except Exception:
-        gsr_spec = {}
+    # --- Filter spec (per-device block, frozen at import) ---
+    gsr_spec = dict(SHIMMER_CFG.gsr_filter_spec)  # local copy
 
     # --- Build stateless SOS chain and per-instance streaming filter ---
     # Use a full sensor key "device:channel" for clearer logs and cache scoping.
     sos_chain = design_sos(sensor_key=f"{timebase_key}:gsr_uS", fs_hz=FS_HZ, spec=gsr_spec)
     pipe = StreamingSOS(sos_chain, context=f"{timebase_key}:gsr_uS")  # Context for runtime logs
+    # One packet carries one sample and must be emitted with its own timestamp, so the
+    # filter runs per sample (no cross-packet buffering); bind the call once here.
+    filter_sample = pipe.apply
+    _isfinite = math.isfinite  # Bound once for the per-sample validation
+
+    # --- Decode kernel inputs: volts per count and feedback resistors by range code ---
+    adc_to_v = VREF_GSR / ADC14_FULL_SCALE
+    r_feedback = tuple(float(RFEEDBACK_MAP[i]) for i in range(4))
+    _warm_kernels()                                          # JIT compile before first packet
+    stopped = stop_event.is_set                              # Bound once; checked every packet
+    gsr_enum = EChannelType.GSR_RAW                          # Closure local, not a per-packet attribute load
 
     # --- Telemetry state (invalid sample aggregation) ---
     _invalid_count = 0
-    _last_telem_t0: Optional[float] = None
+    _pkt_count = 0                                           # Packets in the current window
+    _window_pkts = max(1, int(round(TELEMETRY_WINDOW_S * FS_HZ)))
+    _last_telem_t0: Optional[float] = None                   # Device time of the last flush
     _warned_missing: bool = False
 
     def _telemetry_update(t_s: float, invalid: bool) -> None:
-        """Aggregate invalid samples and emit every TELEMETRY_WINDOW_S seconds."""
-        nonlocal _invalid_count, _last_telem_t0
-        if _last_telem_t0 is None:
-            _last_telem_t0 = t_s
+        """Aggregate invalid samples and emit every TELEMETRY_WINDOW_S seconds (counted in packets)."""
+        nonlocal _invalid_count, _pkt_count, _last_telem_t0
         if invalid:
             _invalid_count += 1
-        elapsed = t_s - _last_telem_t0
-        if elapsed >= TELEMETRY_WINDOW_S:
-            if _invalid_count > 0:
-                logger.warning(
-                    "Telemetry window: sensor=GSR[%s] invalid_samples=%d window=%.1fs",
-                    timebase_key, _invalid_count, elapsed
-                )
-                _invalid_count = 0
-            _last_telem_t0 = t_s
-
-    def handler(pkt: DataPacket) -> List[Tuple[str, ValueT]]:
-        """Process one packet and return the desired channel pairs."""
-        if stop_event.is_set():
-            return []
-
-        # Device-relative time (for telemetry only)
-        t_s = device_time_s(pkt, key=timebase_key)
+        _pkt_count += 1
+        if _pkt_count < _window_pkts:
+            return  # Inside the current window: integer compare only
+        if _invalid_count > 0:
+            # Report device-time span when known (first window: nominal span)
+            elapsed = t_s - _last_telem_t0 if _last_telem_t0 is not None else _pkt_count / FS_HZ
+            logger.warning(
+                "Telemetry window: sensor=GSR[%s] invalid_samples=%d window=%.1fs",
+                timebase_key, _invalid_count, elapsed
+            )
+            _invalid_count = 0
+        _pkt_count = 0
+        _last_telem_t0 = t_s
+
+    def _on_missing(pkt: DataPacket, t_s: float) -> None:
+        """Cold path: count the gap and warn once with a preview of present channels."""
+        nonlocal _warned_missing
+        _telemetry_update(t_s, invalid=True)
+        if not _warned_missing:
+            try:
+                avail = present_channels(pkt)
+                logger.warning("[GSR:%s] MISSING GSR_RAW — available=%s", timebase_key, avail)
+            except Exception:
+                pass
+            _warned_missing = True
+
+    def handler(pkt: DataPacket, t_s: float, out: List[Tuple[str, ValueT]]) -> None:
+        """Process one packet and append the desired channel pairs to out.
+
+        t_s is the packet's device-relative time, converted once by the caller (telemetry only);
+        out is the manager's pair list (cleared per packet), shared by all handlers of the device.
+        """
+        if stopped():
+            return
 
         # Read packed GSR RAW (2 MSB = range, 14 LSB = ADC)
         try:
-            gsr_raw = int(pkt[EChannelType.GSR_RAW])
-        except Exception:
-            _telemetry_update(t_s, invalid=True)
-            nonlocal _warned_missing
-            if not _warned_missing:
-                try:
-                    avail = _present_channels(pkt)
-                    logger.warning("[GSR:%s] MISSING GSR_RAW — available=%s", timebase_key, avail)
-                except Exception:
-                    pass
-                _warned_missing = True
-            return []
-
-        # --- Decode range and ADC ---
-        range_code = (gsr_raw >> 14) & 0x03                  # Extract range code (0..3)
-        adc        = gsr_raw & 0x3FFF                        # 14-bit ADC (0..16383)
-        r_feedback = RFEEDBACK_MAP.get(range_code, RFEEDBACK_MAP[0])  # Fallback to range 0
-        vin = (adc / 16383.0) * VREF_GSR                     # Convert ADC to input voltage
-
-        # --- Convert to µS with bias guard ---
-        invalid = False
-        gsr_uS: Optional[float]
-        if 0.0 < vin < V_BIAS:                               # Valid only below bias
-            r_skin = r_feedback * (V_BIAS / vin - 1.0)       # Skin resistance estimation
-            gsr_uS = 1e6 / max(r_skin, 1e-12)                # Conductance in µS
-        else:
-            gsr_uS = None                                    # Mark invalid sample
-            invalid = True
-
-        out: List[Tuple[str, Optional[float]]] = []
+            gsr_raw = int(pkt[gsr_enum])
+        except (KeyError, IndexError, TypeError, ValueError):
+            _on_missing(pkt, t_s)
+            return
+
+        # --- Decode range/ADC and convert to µS with bias guard (kernel) ---
+        v_uS, invalid = _decode_gsr(gsr_raw, adc_to_v, V_BIAS, r_feedback)
+        gsr_uS: Optional[float] = None if invalid else v_uS  # None marks invalid sample
 
         # --- RAW stream (µS) if requested ---
         if want_raw:
-            out.append((f"RAW_gsr_uS", gsr_uS))
+            out.append((_CH_RAW, gsr_uS))
 
         # --- Filtered stream if requested ---
         if want_filtered:
             if gsr_uS is None:
-                out.append((f"gsr_uS", None))        # Preserve gap on invalid
+                out.append(_FLT_GAP)                         # Preserve gap on invalid
                 invalid = True
             else:
-                v_f = pipe.apply(float(gsr_uS))              # Apply filter on valid only
-                # Sanitize to None if not finite or unexpected type
-                if not (isinstance(v_f, (float, int)) and math.isfinite(float(v_f))):
-                    out.append((f"gsr_uS", None))
-                    invalid = True
+                v_f = filter_sample(gsr_uS)                  # Apply filter on valid only
+                # apply() returns a float for a float input: only finiteness needs checking
+                if _isfinite(v_f):
+                    out.append((_CH_FLT, v_f))
                 else:
-                    out.append((f"gsr_uS", float(v_f)))
+                    out.append(_FLT_GAP)
+                    invalid = True
 
         _telemetry_update(t_s, invalid)
-        return out
     
     logger.info(
         "[GSR:%s] Handler ready (fs=%.1f Hz, raw=%s, filtered=%s)",
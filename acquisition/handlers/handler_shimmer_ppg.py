@@ -9,9 +9,10 @@ import math
 from pyshimmer import DataPacket, EChannelType
 
 from utils.logger import get_logger
-from acquisition.shimmer_timebase import device_time_s
+from acquisition.handlers._shimmer_kernels import _decode_ppg, _warm_kernels
 from processing.rt_filter import StreamingSOS, design_sos
-from utils.config import CONFIG
+from acquisition.handlers._shimmer_common import present_channels
+from acquisition.handlers._shimmer_config import SHIMMER_CFG
 
 """
 Factory-based PPG handler. Reads a configured Shimmer ADC channel, converts to
@@ -22,21 +23,10 @@ logger = get_logger(__name__)
 
 ValueT = Optional[Union[float, int]]
 
-
-# ====== HELPERS ======
-def _present_channels(pkt: DataPacket) -> List[str]:
-    """Return available channel names in this packet (best-effort)."""
-    out: List[str] = []
-    for name in dir(EChannelType):
-        if not name.isupper():
-            continue
-        try:
-            ch = getattr(EChannelType, name)
-            _ = pkt[ch]
-            out.append(name)
-        except Exception:
-            pass
-    return out
+# Output channel names (constant literals: compiled once, interned, shared by every packet)
+_CH_RAW = "RAW_ppg_mV"
+_CH_FLT = "ppg_mV"
+_FLT_GAP = (_CH_FLT, None)  # Immutable gap pair reused for every invalid filtered sample
 
 
 # ====== FACTORY ======
@@ -47,9 +37,9 @@ def build_ppg_handler(
     stop_event: Event,
     want_raw: bool,
     want_filtered: bool,
-) -> Callable[[DataPacket], List[Tuple[str, ValueT]]]:
+) -> Callable[[DataPacket, float, List[Tuple[str, ValueT]]], None]:
     """
-    Return a per-instance PPG handler that yields (channel, value|None) pairs.
+    Return a per-instance PPG handler that appends (channel, value|None) pairs to the caller's list.
 
     RAW emits millivolts under 'RAW_ppg_mV' (no filtering).
     Filtered emits millivolts under 'ppg_mV' using a StreamingSOS chain.
@@ -67,89 +57,97 @@ def build_ppg_handler(
         raise ValueError(f"Invalid PPG channel in instance '{timebase_key}': {PPG_CHANNEL}")
 
     # --- Telemetry window (global; keep a safe default) ---
-    TELEMETRY_WINDOW_S = float(CONFIG.get("telemetry", {}).get("WINDOW_S", 10.0))
+    TELEMETRY_WINDOW_S = SHIMMER_CFG.telemetry_window_s
 
     # --- Filter spec (per-device block) for the logical channel 'ppg_mV' ---
-    try:
-        spec = dict(CONFIG.get("devices", {}).get("shimmer", {}).get("FILTERS", {}).get("ppg_mV", {}))
-    except Exception:
-        spec = {}
+    spec = dict(SHIMMER_CFG.ppg_filter_spec)
 
     # --- Build stateless SOS chain and per-instance streaming filter ---
     # Use a full sensor key "device:channel" for clearer logs and cache scoping.
     sos_chain = design_sos(sensor_key=f"{timebase_key}:ppg_mV", fs_hz=FS_HZ, spec=spec)
     pipe = StreamingSOS(sos_chain, context=f"{timebase_key}:ppg_mV")  # Context for runtime logs
+    # One packet carries one sample and must be emitted with its own timestamp, so the
+    # filter runs per sample (no cross-packet buffering); bind the call once here.
+    filter_sample = pipe.apply
+    _isfinite = math.isfinite  # Bound once for the per-sample validation
+
+    _warm_kernels()                                          # JIT compile before first packet
+    stopped = stop_event.is_set                              # Bound once; checked every packet
 
     # --- Telemetry/debug state ---
     _invalid_count = 0
-    _last_telem_t0: Optional[float] = None
+    _pkt_count = 0                                           # Packets in the current window
+    _window_pkts = max(1, int(round(TELEMETRY_WINDOW_S * FS_HZ)))
+    _last_telem_t0: Optional[float] = None                   # Device time of the last flush
     _warned_missing: bool = False
 
     def _telemetry_update(t_s: float, invalid: bool) -> None:
-        """Aggregate invalid samples and emit every TELEMETRY_WINDOW_S seconds."""
-        nonlocal _invalid_count, _last_telem_t0
-        if _last_telem_t0 is None:
-            _last_telem_t0 = t_s
+        """Aggregate invalid samples and emit every TELEMETRY_WINDOW_S seconds (counted in packets)."""
+        nonlocal _invalid_count, _pkt_count, _last_telem_t0
         if invalid:
             _invalid_count += 1
-        elapsed = t_s - _last_telem_t0
-        if elapsed >= TELEMETRY_WINDOW_S:
-            if _invalid_count > 0:
-                logger.warning(
-                    "Telemetry window: sensor=PPG[%s] invalid_samples=%d window=%.1fs",
-                    timebase_key, _invalid_count, elapsed
-                )
-                _invalid_count = 0
-            _last_telem_t0 = t_s
-
-    def handler(pkt: DataPacket) -> List[Tuple[str, ValueT]]:
-        """Process one packet and return the desired channel pairs."""
-        if stop_event.is_set():
-            return []
-
-        # Device-relative time (for telemetry only)
-        t_s = device_time_s(pkt, key=timebase_key)
+        _pkt_count += 1
+        if _pkt_count < _window_pkts:
+            return  # Inside the current window: integer compare only
+        if _invalid_count > 0:
+            # Report device-time span when known (first window: nominal span)
+            elapsed = t_s - _last_telem_t0 if _last_telem_t0 is not None else _pkt_count / FS_HZ
+            logger.warning(
+                "Telemetry window: sensor=PPG[%s] invalid_samples=%d window=%.1fs",
+                timebase_key, _invalid_count, elapsed
+            )
+            _invalid_count = 0
+        _pkt_count = 0
+        _last_telem_t0 = t_s
+
+    def _on_missing(pkt: DataPacket, t_s: float) -> None:
+        """Cold path: count the gap and warn once with a preview of present channels."""
+        nonlocal _warned_missing
+        _telemetry_update(t_s, invalid=True)
+        if not _warned_missing:
+            try:
+                avail = present_channels(pkt)
+                logger.warning("[PPG:%s] MISSING %s — available=%s", timebase_key, PPG_CHANNEL, avail)
+            except Exception:
+                pass
+            _warned_missing = True
+
+    def handler(pkt: DataPacket, t_s: float, out: List[Tuple[str, ValueT]]) -> None:
+        """Process one packet and append the desired channel pairs to out.
+
+        t_s is the packet's device-relative time, converted once by the caller (telemetry only);
+        out is the manager's pair list (cleared per packet), shared by all handlers of the device.
+        """
+        if stopped():
+            return
 
         # Read ADC from configured channel
         try:
             adc = int(pkt[ppg_ch_enum])                      # 14-bit ADC 0..16383
-        except Exception:
-            _telemetry_update(t_s, invalid=True)
-            nonlocal _warned_missing
-            if not _warned_missing:
-                try:
-                    avail = _present_channels(pkt)
-                    logger.warning("[PPG:%s] MISSING %s — available=%s", timebase_key, PPG_CHANNEL, avail)
-                except Exception:
-                    pass
-                _warned_missing = True
-            return []
-
-        # Convert ADC → mV (14-bit range)
-        v_mv = (adc / 16383.0) * VREF_PPG * 1000.0
-        if PPG_INV:
-            v_mv = -v_mv
-
-        out: List[Tuple[str, Optional[float]]] = []
+        except (KeyError, IndexError, TypeError, ValueError):
+            _on_missing(pkt, t_s)
+            return
+
+        # Convert ADC → mV (14-bit range, optional inversion; kernel)
+        v_mv = _decode_ppg(adc, VREF_PPG, PPG_INV)
         invalid = False
 
         # RAW stream (mV) if requested
         if want_raw:
-            out.append((f"RAW_ppg_mV", float(v_mv)))
+            out.append((_CH_RAW, v_mv))                      # Kernel always returns a float
 
         # Filtered stream (mV) if requested
         if want_filtered:
-            v_f = pipe.apply(float(v_mv))
-            # Sanitize to None if not finite or unexpected type
-            if not (isinstance(v_f, (float, int)) and math.isfinite(float(v_f))):
-                export_val: Optional[float] = None
-                invalid = True
+            v_f = filter_sample(v_mv)
+            # apply() returns a float for a float input: only finiteness needs checking
+            if _isfinite(v_f):
+                export_val: Optional[float] = v_f
             else:
-                export_val = float(v_f)
-            out.append((f"ppg_mV", export_val))
+                export_val = None
+                invalid = True
+            out.append((_CH_FLT, export_val))
 
         _telemetry_update(t_s, invalid)
-        return out
 
     logger.info(
         "[PPG:%s] Handler ready (ch=%s, fs=%.1f Hz, invert=%s, raw=%s, filtered=%s)",
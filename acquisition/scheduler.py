@@ -0,0 +1,94 @@
+# acquisition/scheduler.py
+# Shared deadline scheduler: one daemon thread drives all periodic demo producers.
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+"""
+Min-heap of (deadline, job) on a single worker thread. A producer registers a
+tick callable `tick(now) -> next_deadline | None`; the scheduler sleeps until
+the earliest deadline, runs that tick outside the lock, and re-queues the job
+at the returned deadline (None ends the job). Deadlines use time.monotonic().
+"""
+
+logger = get_logger(__name__)
+
+TickFn = Callable[[float], Optional[float]]
+
+
+# ====== JOB HANDLE ======
+class ScheduledJob:
+    """Handle returned by schedule(); cancel() drops the job at its next turn."""
+
+    __slots__ = ("name", "tick", "cancelled")
+
+    def __init__(self, name: str, tick: TickFn) -> None:
+        self.name = name            # For logs only
+        self.tick = tick            # Producer callback
+        self.cancelled = False      # Checked before every dispatch/re-queue
+
+    def cancel(self) -> None:
+        """Stop dispatching this job (an in-flight tick completes normally)."""
+        self.cancelled = True
+
+
+# ====== SCHEDULER ======
+class _Scheduler:
+    """Single-threaded dispatcher for periodic producers (lazy-started daemon)."""
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, ScheduledJob]] = []
+        self._seq = itertools.count()          # Tie-breaker for equal deadlines
+        self._cond = threading.Condition()     # Guards heap; wakes on earlier deadlines
+        self._thr: Optional[threading.Thread] = None
+
+    def schedule(self, name: str, tick: TickFn, first_deadline: float) -> ScheduledJob:
+        """Register a producer; tick(now) runs at first_deadline, then as it returns."""
+        job = ScheduledJob(name, tick)
+        with self._cond:
+            heapq.heappush(self._heap, (float(first_deadline), next(self._seq), job))
+            if self._thr is None:
+                self._thr = threading.Thread(target=self._run, name="DemoScheduler", daemon=True)
+                self._thr.start()
+                logger.info("Demo scheduler thread started")
+            self._cond.notify()                # New head may be earlier than current wait
+        return job
+
+    def _run(self) -> None:
+        """Wait for the earliest deadline, dispatch, re-queue; forever (daemon)."""
+        heap = self._heap
+        while True:
+            with self._cond:
+                while True:
+                    while heap and heap[0][2].cancelled:
+                        heapq.heappop(heap)    # Drop cancelled jobs lazily
+                    if not heap:
+                        self._cond.wait()
+                        continue
+                    wait_s = heap[0][0] - time.monotonic()
+                    if wait_s <= 0.0:
+                        _, _, job = heapq.heappop(heap)
+                        break
+                    self._cond.wait(wait_s)
+
+            # Run the producer outside the lock so schedule()/cancel() never block on it
+            try:
+                next_deadline = job.tick(time.monotonic())
+            except Exception as e:
+                logger.error("Scheduler job '%s' failed and was dropped: %s", job.name, e)
+                next_deadline = None
+
+            if next_deadline is not None and not job.cancelled:
+                with self._cond:
+                    heapq.heappush(heap, (next_deadline, next(self._seq), job))
+
+
+# ====== SINGLETON ======
+scheduler = _Scheduler()
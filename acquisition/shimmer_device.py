@@ -132,45 +132,39 @@ class ShimmerManager:
             self.shim = None
             raise RuntimeError(f"Shimmer connect failed for {self.device_name}")
 
+        # Only the enabled handlers, fixed once here: the per-packet loop has no None checks.
+        handlers = tuple(
+            (label, fn) for label, fn in (("GSR", gsr_fn), ("PPG", ppg_fn), ("EMG", emg_fn))
+            if fn is not None
+        )
+
         # --- Unified callback definition ---
         from processing.sync_controller import sync_manager as SYNC
+        stopped = self._stop_evt.is_set     # Bound once; called every packet
+        # One pair list reused across packets (cleared on entry): pyshimmer delivers packets
+        # on a single reader thread and SYNC receives a tuple() copy, so handlers must not
+        # keep a reference to it and nothing downstream ever sees the list itself.
+        pairs: List[Tuple[str, ValueT]] = []
 
         def _on_packet(pkt) -> None:
             """Handle incoming packet and forward valid data to SYNC."""
-            if self._stop_evt.is_set():     # Early exit on stop
+            if stopped():                   # Early exit on stop
                 return
             try:
-                # Packet timestamp conversion in relative seconds
+                # Packet timestamp conversion in relative seconds (once; shared by all handlers)
                 t_s = shimmer_timebase.device_time_s(pkt, key=self.device_name)
-                pairs: List[Tuple[str, ValueT]] = []    # Prepare result list as tuples
-
-                # Collect handler outputs (best-effort)
-                if gsr_fn:
-                    try:
-                        pairs.extend(gsr_fn(pkt))   # Call GSR handler and save result
-                    except Exception as err:
-                        logger.warning("[%s] GSR handler error: %s", self.device_name, err)
+                pairs.clear()                           # Handlers append this packet's pairs
 
-                if ppg_fn:
+                # Collect handler outputs (best-effort; one failing sensor never blocks the others)
+                for label, fn in handlers:
                     try:
-                        pairs.extend(ppg_fn(pkt))   # Call PPG handler and save result
+                        fn(pkt, t_s, pairs)
                     except Exception as err:
-                        logger.warning("[%s] PPG handler error: %s", self.device_name, err)
-
-                if emg_fn:
-                    try:
-                        pairs.extend(emg_fn(pkt))
-                    except Exception as err:
-                        logger.warning("[%s] EMG handler error: %s", self.device_name, err)
-
+                        logger.warning("[%s] %s handler error: %s", self.device_name, label, err)
 
                 # Push data if any channel produced output
                 if pairs:
-                    SYNC.enqueue_packet(
-                        device_ts=float(t_s),
-                        device_name=self.device_name,
-                        channel_pairs=pairs,
-                    )
+                    SYNC.enqueue_packet_fast(float(t_s), self.device_name, tuple(pairs))
 
             except Exception as e:
                 logger.warning("[%s] Packet processing failed: %s", self.device_name, e)
@@ -4,7 +4,7 @@
 from __future__ import annotations
 
 from threading import Lock
-from typing import TypedDict, Optional, Dict
+from typing import Optional, Dict
 from pyshimmer import EChannelType
 from utils.logger import get_logger
 
@@ -18,55 +18,59 @@ logger = get_logger(__name__)
 # --- Shimmer timestamp characteristics (constants) ---
 _TICK_RATE_HZ: float = 32768.0     # Device tick frequency
 _COUNTER_MOD: int = 65536          # 16-bit counter modulus
+_TS_ENUM = EChannelType.TIMESTAMP  # Bound once: one global load per packet, no attribute lookup
 
 
-# --- Per-device state (protected by _STATE_LOCK) ---
-class _StateEntry(TypedDict):
-    start: Optional[int]  # First observed tick (anchor); None before first packet
-    last: Optional[int]   # Last raw tick observed (for rollover detection)
-    offset: int           # Accumulated ticks added at each rollover
+# --- Per-device state (each entry guarded by its own lock) ---
+class _StateEntry:
+    """Rollover state for one device key; devices never contend on each other's lock."""
 
-_STATE: Dict[str, _StateEntry] = {}   # key -> {"start": int|None, "last": int|None, "offset": int}
-_STATE_LOCK = Lock()                  # Ensure thread-safe access
+    __slots__ = ("start", "last", "offset", "lock")
+
+    def __init__(self) -> None:
+        self.start: Optional[int] = None  # First observed tick (anchor); None before first packet
+        self.last: Optional[int] = None   # Last raw tick observed (for rollover detection)
+        self.offset: int = 0              # Accumulated ticks added at each rollover
+        self.lock = Lock()                # Per-device; uncontended in steady state
+
+_STATE: Dict[str, _StateEntry] = {}   # key -> _StateEntry
+_STATE_LOCK = Lock()                  # Guards insertion of new keys only
 
 
 # ====== PUBLIC API ======
 def reset(key: str = "default") -> None:
     """Reset timebase for a device key (anchor cleared, offset=0)."""
     with _STATE_LOCK:
-        _STATE[key] = {"start": None, "last": None, "offset": 0}
+        _STATE[key] = _StateEntry()
     logger.debug("Shimmer timebase reset for key=%s.", key)
 
 
 def device_time_s(pkt, key: str = "default") -> float:
     """Convert packet tick counter to seconds (thread-safe, rollover-aware)."""
     # Extract raw 16-bit tick from packet (raises if missing)
-    ts_raw = int(pkt[EChannelType.TIMESTAMP])
+    ts_raw = int(pkt[_TS_ENUM])
 
-    with _STATE_LOCK:
-        st = _STATE.setdefault(key, {"start": None, "last": None, "offset": 0})
-        start = st["start"]
-        last = st["last"]
-        offset = st["offset"]
+    st = _STATE.get(key)
+    if st is None:
+        with _STATE_LOCK:                 # Slow path: first packet for an unknown key
+            st = _STATE.setdefault(key, _StateEntry())
+
+    with st.lock:
+        start = st.start
 
         # Anchor on first packet
         if start is None:
-            st["start"] = ts_raw
-            st["last"] = ts_raw
-            st["offset"] = 0
-            start = ts_raw
-            last = ts_raw
-            offset = 0
+            st.start = st.last = ts_raw
+            st.offset = 0
             logger.info("Shimmer timebase anchored for key=%s (start_ts=%d).", key, ts_raw)
-        else:
-            # Detect 16-bit rollover: current raw tick wrapped below last seen
-            if last is not None and ts_raw < last:
-                st["offset"] = offset + _COUNTER_MOD
-                offset = st["offset"]
-            # Update last seen raw tick
-            st["last"] = ts_raw
+            return 0.0
+
+        # Detect 16-bit rollover: current raw tick wrapped below last seen
+        if ts_raw < st.last:
+            st.offset += _COUNTER_MOD
+        st.last = ts_raw                  # Update last seen raw tick
 
         # Total ticks since anchor = accumulated offset + (current - start)
-        total_ticks = offset + (ts_raw - start)
+        total_ticks = st.offset + (ts_raw - start)
 
-    return float(total_ticks) / _TICK_RATE_HZ
\ No newline at end of file
+    return float(total_ticks) / _TICK_RATE_HZ
@@ -5,17 +5,20 @@ from __future__ import annotations
 
 from utils.logger import get_logger
 import random  # Randomized cadence for marker emission
-import threading
+import time
 from typing import Iterable, Optional, Tuple
 
 from utils.config import CONFIG
+from acquisition.scheduler import ScheduledJob, scheduler
 from processing.sync_controller import sync_manager as SYNC
 
 logger = get_logger(__name__)
 
+_STARTUP_GRACE_S = 3.0  # Let other components initialize before the first marker
+
 # ====== RUNNER ======
 class _PeriodicSpikeRunner:
-    """Run a background thread that periodically triggers spikes.
+    """Periodically trigger spikes from the shared scheduler thread.
 
     Emits SYNC.trigger_spike(label, source). Stops via stop().
     """
@@ -25,48 +28,40 @@ class _PeriodicSpikeRunner:
         self._name = str(name)                         # Source for controller
         self._delay_range = tuple(delay_range_sec)     # Emit cadence range (s)
         self._labels = list(labels) or ["SPIKE"]       # Available labels
-        self._stop = threading.Event()                 # Cooperative stop flag
-        self._thr = threading.Thread(            # Daemon thread drives emission loop
-            target=self._loop, name=f"SpikeDemo:{self._name}", daemon=True
-        )
+        self._rng = random.Random()                    # Private RNG state per runner
+        self._stagger = min((hash(self._name) % 100) / 100.0, 0.99)  # Per-name start offset (s)
+        self._job: Optional[ScheduledJob] = None       # Shared scheduler handle
 
     def start(self) -> "_PeriodicSpikeRunner":
-        """Start the background thread."""
+        """Register the emit tick on the shared scheduler."""
         logger.info("Starting spike demo emitter '%s'", self._name)
-        self._thr.start()
+        # Startup grace period plus a per-name stagger to avoid same-bucket collisions
+        first = time.monotonic() + _STARTUP_GRACE_S + self._stagger
+        self._job = scheduler.schedule(f"SpikeDemo:{self._name}", self._tick, first)
         return self
 
     def stop(self) -> None:
-        """Signal stop and wait briefly for thread exit."""
-        self._stop.set()
-        try:
-            self._thr.join(timeout=1.0)
-        except Exception:
-            pass
+        """Cancel the scheduled job; an in-flight emit completes normally."""
+        if self._job is not None:
+            self._job.cancel()
         logger.info("Stopped spike demo emitter '%s'", self._name)
 
-    # --- Thread loop ---
-    def _loop(self) -> None:
-        """Periodic emit loop that picks random labels with random delays."""
-        # Startup grace period to let other components initialize
-        if self._stop.wait(3.0):
-            return
-        # Initial stagger to reduce same-bucket collisions across instances
-        self._stop.wait((hash(self._name) % 100) / 100.0)  # ≤ 0.99 s
-        while not self._stop.is_set():
-            try:
-                label = random.choice(self._labels)       # Pick label
-                SYNC.trigger_spike(label, self._name)     # Instant trigger
-            except Exception:
-                pass                                      # Keep running
-            self._stop.wait(self._next_delay())           # Cadence sleep
+    # --- Scheduler tick ---
+    def _tick(self, now: float) -> float:
+        """Emit one random label and return the next deadline."""
+        try:
+            label = self._rng.choice(self._labels)    # Pick label
+            SYNC.trigger_spike(label, self._name)     # Instant trigger
+        except Exception:
+            pass                                      # Keep running
+        return now + self._next_delay()               # Cadence
 
     def _next_delay(self) -> float:
         """Pick the next delay (s) within the configured range."""
         lo, hi = self._delay_range
         if hi <= lo:
             return max(lo, 0.0)              # Degenerate range collapses to single delay
-        return max(random.uniform(lo, hi), 0.0)
+        return max(self._rng.uniform(lo, hi), 0.0)
 
 
 def _sanitize_delay_range(delay_range) -> Optional[Tuple[float, float]]:
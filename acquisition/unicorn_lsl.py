@@ -3,12 +3,15 @@
 
 from __future__ import annotations
 
+import sys
 import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from utils.logger import get_logger
-from processing.rt_filter import StreamingSOS, design_sos
+from processing.rt_filter import StreamingSOSBank, design_sos
 from processing.sync_controller import sync_manager as SYNC
 from acquisition.unicorn_lsl_timebase import UnicornLSLTimebase
 from utils.config import CONFIG
@@ -16,12 +19,26 @@ from utils.config import CONFIG
 logger = get_logger(__name__)
 
 try:
-    from pylsl import resolve_byprop, resolve_streams, StreamInlet, StreamInfo
+    from pylsl import (
+        resolve_byprop, resolve_streams, StreamInlet, StreamInfo,
+        cf_float32, cf_double64, cf_int8, cf_int16, cf_int32, cf_int64,
+    )
 except Exception as e:  # pragma: no cover
     raise RuntimeError(
         "pylsl is required for Unicorn LSL acquisition. Install with: pip install pylsl"
     ) from e
 
+# LSL channel formats that pull_chunk can write straight into a NumPy buffer (dest_obj);
+# dtypes match pylsl's ctypes value types. Only cf_string needs the list API.
+_DEST_DTYPES = {
+    cf_float32: np.float32,
+    cf_double64: np.float64,
+    cf_int8: np.int8,
+    cf_int16: np.int16,
+    cf_int32: np.int32,
+    cf_int64: np.int64,
+}
+
 
 # ====== RESOLUTION HELPERS ======
 def _pick_latest_by_created_at(infos: List[StreamInfo]) -> Optional[StreamInfo]:
@@ -29,7 +46,9 @@ def _pick_latest_by_created_at(infos: List[StreamInfo]) -> Optional[StreamInfo]:
     if not infos:
         return None
     try:
-        return max(infos, key=lambda inf: float(getattr(inf, "created_at", lambda: 0.0)() or 0.0))
+        # One created_at() call per candidate; ties keep the earliest (as max() did).
+        created = [float(inf.created_at() or 0.0) if hasattr(inf, "created_at") else 0.0 for inf in infos]
+        return infos[int(np.argmax(created))]
     except Exception:
         return infos[0]
 
@@ -109,8 +128,8 @@ class UnicornManager:
         self.resolve_timeout_s = float(params.get("RESOLVE_TIMEOUT_S", 5.0))
 
         # Inlet parameters
-        self.inlet_chunk_len = int(params.get("INLET_CHUNK_LEN", 0))  # 0 → source-controlled
-        self.inlet_max_buf_s = float(params.get("INLET_MAX_BUF_S", 10.0))
+        self.inlet_chunk_len = int(params.get("INLET_CHUNK_LEN", 0))  # 0 → max(8, fs/50) samples per pull
+        self.inlet_max_buf_s = float(params.get("INLET_MAX_BUF_S", 1.0))  # Inlet backlog cap (s)
 
         # Index selection: which columns of the incoming stream are EEG (0-based).
         # Default: first 8 indices (common Unicorn "Data" layout: EEG first).
@@ -135,8 +154,21 @@ class UnicornManager:
         self._inlet: Optional[StreamInlet] = None
         self._srate: float = 0.0
 
-        # Per-channel filters (allocated on start if needed)
-        self._pipes: Dict[int, StreamingSOS] = {}
+        # Reusable pull buffer (rows=max samples per pull, cols=stream channels); None → list API
+        self._buf: Optional[np.ndarray] = None
+        self._pull_max: int = 0
+
+        # Column plan: stream columns of the 8 EEG channels, and RAW outputs (names + EEG columns)
+        self._eeg_idx_arr = np.asarray(self.eeg_indexes, dtype=np.intp)
+        self._raw_names: Tuple[str, ...] = tuple(sys.intern(f"RAW_eeg{i}_uV") for i in sorted(self.want_raw_idx))
+        self._raw_cols = np.asarray([i - 1 for i in sorted(self.want_raw_idx)], dtype=np.intp)
+
+        # Filtered outputs (allocated on start if needed): one filter bank over all
+        # enabled channels; names and EEG columns in emission order.
+        self._bank: Optional[StreamingSOSBank] = None
+        self._flt_names: Tuple[str, ...] = ()
+        self._out_names: Tuple[str, ...] = self._raw_names      # RAW then filtered: block column order
+        self._flt_cols = np.empty(0, dtype=np.intp)
 
         self._tb: Optional[UnicornLSLTimebase] = None  # Deterministic 1/fs timebase
 
@@ -145,14 +177,13 @@ class UnicornManager:
         self._telem_invalid_count: int = 0  # Invalid samples counter in current window
         self._telem_last_t0: Optional[float] = None  # Window start time (device time)
 
-    # --- Telemetry helper (same syntax/behavior as Shimmer) ---
-    def _telemetry_update(self, t_s: float, invalid: bool) -> None:
-        """Aggregate invalid samples and emit every WINDOW_S seconds."""
+    # --- Telemetry helper (same window/log format as Shimmer, updated per chunk) ---
+    def _telemetry_update_block(self, ts_last: float, invalid_count: int) -> None:
+        """Add a chunk's invalid samples and emit every WINDOW_S seconds (checked at chunk ends)."""
         if self._telem_last_t0 is None:
-            self._telem_last_t0 = t_s  # Initialize window start
-        if invalid:
-            self._telem_invalid_count += 1  # Count invalid sample
-        elapsed = t_s - self._telem_last_t0
+            self._telem_last_t0 = ts_last  # Initialize window start
+        self._telem_invalid_count += invalid_count
+        elapsed = ts_last - self._telem_last_t0
         if elapsed >= self._telemetry_window_s:
             if self._telem_invalid_count > 0:
                 logger.warning(
@@ -160,7 +191,7 @@ class UnicornManager:
                     self.device_name, self._telem_invalid_count, elapsed
                 )
                 self._telem_invalid_count = 0  # Reset counter
-            self._telem_last_t0 = t_s  # Roll window
+            self._telem_last_t0 = ts_last  # Roll window
 
     # ====== PUBLIC API ======
     def start_stream(self) -> None:
@@ -199,12 +230,23 @@ class UnicornManager:
             self.device_name, name, info.type() or "?", chn_count, srate, self.eeg_indexes
         )
 
+        # Preallocate the pull buffer once: pylsl writes samples straight into it (dest_obj)
+        # instead of building a list of lists per chunk (all numeric formats).
+        # Small, regular pulls (~20 ms) bound per-chunk latency; INLET_CHUNK_LEN > 0 overrides.
+        self._pull_max = self.inlet_chunk_len if self.inlet_chunk_len > 0 else max(8, int(srate // 50))
+        buf_dtype = _DEST_DTYPES.get(info.channel_format())
+        self._buf = (
+            np.empty((self._pull_max, chn_count), dtype=buf_dtype, order="C")
+            if buf_dtype is not None else None
+        )
+
         # Build deterministic timebase anchored on first stamp
         self._tb = UnicornLSLTimebase(fs_hz=self._srate)
 
         # Open inlet and check initial liveness.
         try:
-            inlet = StreamInlet(info, max_buflen=int(self.inlet_max_buf_s))
+            # max_buflen is whole seconds; int(<1.0) would be 0, so clamp to at least 1 s.
+            inlet = StreamInlet(info, max_buflen=max(1, int(round(self.inlet_max_buf_s))))
             inlet.open_stream(timeout=self.resolve_timeout_s)
             self._inlet = inlet
         except Exception as e:
@@ -213,7 +255,7 @@ class UnicornManager:
 
         if not self._liveness_check(self._inlet):
             self._safe_close_inlet()
-            raise RuntimeError(f"[{self.device_name}] No data received in liveness window.")
+            raise RuntimeError(f"[{self.device_name}] LSL outlet did not respond in liveness window.")
 
         # Prepare filters: one spec 'eeg_uV' applied to all 8 filtered channels.
         try:
@@ -228,18 +270,22 @@ class UnicornManager:
 
         sos_chain = design_sos(sensor_key=f"{self.device_name}:eeg_uV", fs_hz=self._srate, spec=spec)
 
-        self._pipes.clear()
-        for i in range(1, self.expected_eeg_channels + 1):
-            if i in self.want_flt_idx:
-                self._pipes[i] = StreamingSOS(sos_chain, context=f"{self.device_name}:eeg{i}_uV")
+        flt_idx = [i for i in range(1, self.expected_eeg_channels + 1) if i in self.want_flt_idx]
+        self._flt_names = tuple(sys.intern(f"eeg{i}_uV") for i in flt_idx)
+        self._out_names = self._raw_names + self._flt_names    # Frozen output schema for this stream
+        self._flt_cols = np.asarray([i - 1 for i in flt_idx], dtype=np.intp)
+        self._bank = (
+            StreamingSOSBank(sos_chain, len(flt_idx), context=f"{self.device_name}:eeg_uV")
+            if flt_idx else None
+        )
 
         # Spawn reader thread (read loop only; resolution already done).
         self._stop_evt.clear()
         t = threading.Thread(target=self._read_loop, name=f"Unicorn[{self.device_name}]", daemon=True)
         t.start()
         self._thread = t
-        logger.info("[%s] Streaming started (chunk_len=%s).",
-                    self.device_name, "src" if self.inlet_chunk_len <= 0 else str(self.inlet_chunk_len))
+        logger.info("[%s] Streaming started (chunk_len=%d%s).",
+                    self.device_name, self._pull_max, "" if self.inlet_chunk_len > 0 else " auto")
 
     def stop(self) -> None:
         """Signal stop and close inlet safely."""
@@ -256,16 +302,16 @@ class UnicornManager:
 
     # ====== INTERNALS ======
     def _liveness_check(self, inlet: StreamInlet) -> bool:
-        """Return True if at least one chunk arrives within ~1.0 s."""
-        t0 = time.monotonic()
-        while (time.monotonic() - t0) < 1.0 and not self._stop_evt.is_set():
-            try:
-                s, _ = inlet.pull_chunk(timeout=0.1)
-                if s:
-                    return True
-            except Exception:
-                break
-        return False
+        """Return True if the outlet answers a time_correction probe within ~1.0 s.
+
+        Probing the clock instead of pulling keeps every sample in the inlet
+        buffer for _read_loop, so nothing is discarded at startup.
+        """
+        try:
+            inlet.time_correction(timeout=1.0)
+            return True
+        except Exception:
+            return False
 
     def _safe_close_inlet(self) -> None:
         """Close inlet with guards and clear reference."""
@@ -285,77 +331,88 @@ class UnicornManager:
         if inlet is None:
             return
 
+        buf = self._buf
+        pull_max = self._pull_max
+        eeg_idx = self._eeg_idx_arr
+        raw_cols = self._raw_cols
+        bank = self._bank
+        flt_cols = self._flt_cols
+        out_names = self._out_names
+        n_out = len(out_names)
+        n_raw = len(raw_cols)
+        tb = self._tb
+        stopped = self._stop_evt.is_set
+
+        # Reusable stamp buffer: pylsl hands stamps back as a list, copied in C into float64.
+        ts_buf = np.empty(pull_max, dtype=np.float64)
+
+        # Pull variant fixed by the stream format: chosen once, not re-tested per chunk.
+        if buf is not None:
+            def pull():
+                """Samples land in the reusable buffer; returns views (valid until the next pull)."""
+                _, stamps = inlet.pull_chunk(timeout=0.2, max_samples=pull_max, dest_obj=buf)
+                n = len(stamps)
+                ts_buf[:n] = stamps
+                return buf[:n], ts_buf[:n]
+        else:
+            def pull():
+                """String stream format: list API, same pull size as the buffered path."""
+                samples, stamps = inlet.pull_chunk(max_samples=pull_max, timeout=0.2)
+                n = len(stamps)
+                ts_buf[:n] = stamps
+                return samples, ts_buf[:n]
+
         try:
-            while not self._stop_evt.is_set():
-                # Use source-controlled chunking unless inlet_chunk_len > 0.
-                if self.inlet_chunk_len > 0:
-                    samples, stamps = inlet.pull_chunk(max_samples=self.inlet_chunk_len, timeout=0.2)
-                else:
-                    samples, stamps = inlet.pull_chunk(timeout=0.2)
-
-                if not samples:
+            while not stopped():
+                samples, stamps = pull()
+                if stamps.shape[0] == 0:
                     continue  # Idle gaps are normal on LSL; keep loop light.
 
-                # Prime timebase on the very first stamp of the first non-empty chunk
-                if self._tb is not None and not self._tb.anchored:
+                if not out_names:
+                    continue  # Nothing enabled for this device
+
+                # Gather the EEG columns for the whole chunk at once → (n, 8) float64.
+                # Indexes were validated against channel_count in start_stream.
+                eeg = np.asarray(samples)[:, eeg_idx].astype(np.float64)
+                n = eeg.shape[0]
+
+                # Output matrix in out_names order: RAW pass-through µV, then filtered.
+                # Fresh per chunk: ownership passes to SYNC with the enqueue.
+                values = np.empty((n, n_out), dtype=np.float64)
+                values[:, :n_raw] = eeg[:, raw_cols]
+                gaps: Optional[np.ndarray] = None
+                n_invalid = 0                                                 # Rows with a filtered gap
+                if bank is not None:
+                    # Filter all enabled channels over the whole chunk (state carried across chunks).
+                    flt_mat = bank.apply_block(eeg[:, flt_cols])
+                    values[:, n_raw:] = flt_mat
+                    # Non-finite filtered values are exported as None (gaps): one vectorized scan.
+                    bad = ~np.isfinite(flt_mat)
+                    bad_rows = bad.any(axis=1)
+                    n_invalid = int(np.count_nonzero(bad_rows))
+                    if n_invalid:
+                        gaps = np.zeros((n, n_out), dtype=bool)
+                        gaps[:, n_raw:] = bad
+
+                # Use deterministic 1/fs timebase to remove LSL jitter (one call per chunk;
+                # it anchors itself on the first stamp it sees)
+                ts_out = None
+                if tb is not None:
                     try:
-                        first_stamp = float(stamps[0])
-                        self._tb.prime_from_first_stamp(first_stamp)
+                        ts_out = tb.next_tick_block(stamps)                  # New array
                     except Exception:
-                        # If stamps[] is empty/unexpected, prime lazily in next_tick()
+                        # Best-effort: on any error, keep the raw LSL stamps
                         pass
+                if ts_out is None:
+                    ts_out = stamps.copy()                                   # ts_buf is reused
+
+                # --- Telemetry update based on filtered invalidity (like Shimmer), once per chunk ---
+                self._telemetry_update_block(float(ts_out[-1]), n_invalid)
 
-                for row, ts in zip(samples, stamps):
-                    # Extract only the EEG columns by configured indexes (0-based).
-                    # If row shorter than expected, pad with NaN; if longer, it's fine.
-                    vals: List[float] = []
-                    for idx in self.eeg_indexes:
-                        v = float(row[idx]) if idx < len(row) else float("nan")
-                        vals.append(v)
-
-                    pairs: List[Tuple[str, Optional[float]]] = []
-
-                    # RAW emissions (1..8).
-                    for i in self.want_raw_idx:
-                        v = float(vals[i - 1])  # Pass-through RAW in uV
-                        pairs.append((f"RAW_eeg{i}_uV", v))
-
-                    # Filtered emissions (1..8).
-                    invalid_sample = False  # Track invalidity for telemetry
-                    for i in self.want_flt_idx:
-                        v = float(vals[i - 1])
-                        pipe = self._pipes.get(i)
-                        if pipe is not None:
-                            v_f = pipe.apply(v)
-                            # Convert non-finite to None for downstream safety.
-                            if not (isinstance(v_f, (int, float)) and (v_f == v_f)):
-                                export_val: Optional[float] = None
-                                invalid_sample = True  # Mark invalid filtered sample
-                            else:
-                                export_val = float(v_f)
-                            pairs.append((f"eeg{i}_uV", export_val))
-
-                    if pairs:
-                        try:
-                            # Use deterministic 1/fs timebase to remove LSL jitter
-                            dev_ts = float(ts)  # Fallback value
-                            if self._tb is not None:
-                                try:
-                                    dev_ts = self._tb.next_tick(last_seen_lsl_stamp=float(ts))
-                                except Exception:
-                                    # Best-effort: on any error, fall back to raw LSL stamp
-                                    dev_ts = float(ts)
-
-                            # --- Telemetry update based on filtered invalidity (like Shimmer) ---
-                            self._telemetry_update(dev_ts, invalid_sample)
-
-                            SYNC.enqueue_packet(
-                                device_ts=dev_ts,
-                                device_name=self.device_name,
-                                channel_pairs=pairs,
-                            )
-                        except Exception as e:
-                            logger.warning("[%s] enqueue_packet failed: %s", self.device_name, e)
+                try:
+                    SYNC.enqueue_columnar(self.device_name, ts_out, out_names, values, gaps)
+                except Exception as e:
+                    logger.warning("[%s] enqueue_columnar failed: %s", self.device_name, e)
 
         except Exception as e:
             logger.error("[%s] Read loop error: %s", self.device_name, e)
@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 
-import threading
+import numpy as np
 
 
 class UnicornLSLTimebase:
@@ -12,6 +12,10 @@ class UnicornLSLTimebase:
     Summary: map incoming EEG samples to a deterministic device_ts at 1/fs.
     Body: on first use, anchor to the first LSL stamp; then each sample gets
     prev + 1/fs. Optional soft realign if a long inactivity is detected.
+
+    Single-producer: only the reader thread primes and ticks, so there is no
+    lock. reset() from another thread only clears the anchor flag (one
+    attribute store); the next tick then re-primes from its own stamp.
     """
 
     # ====== CONSTRUCTION ======
@@ -19,7 +23,6 @@ class UnicornLSLTimebase:
         """Configure nominal fs and reset internal state."""
         self._fs = float(fs_hz) if fs_hz and fs_hz > 0 else 250.0  # Nominal fs
         self._dt = 1.0 / self._fs                                  # Uniform step
-        self._lock = threading.Lock()                               # Thread safety
 
         self._anchored = False                                      # Anchor flag
         self._t_curr = 0.0                                          # Next tick ts
@@ -28,19 +31,15 @@ class UnicornLSLTimebase:
 
     # ====== CONTROL ======
     def reset(self) -> None:
-        """Clear anchor to restart from next first stamp."""
-        with self._lock:
-            self._anchored = False
-            self._t_curr = 0.0
-            self._last_wall = 0.0
+        """Clear anchor to restart from next first stamp (priming rewrites the state)."""
+        self._anchored = False
 
     def prime_from_first_stamp(self, first_stamp: float) -> None:
         """Anchor on first LSL stamp and prepare next tick."""
-        with self._lock:
-            base = float(first_stamp)
-            self._t_curr = base
-            self._last_wall = base
-            self._anchored = True
+        base = float(first_stamp)
+        self._t_curr = base
+        self._last_wall = base
+        self._anchored = True
 
     # ====== MAPPING ======
     def next_tick(self, last_seen_lsl_stamp: float | None = None) -> float:
@@ -50,25 +49,62 @@ class UnicornLSLTimebase:
         timeline to that stamp before continuing at 1/fs. Normal operation does
         not depend on LSL jitter.
         """
-        with self._lock:
-            if not self._anchored:
-                # Defensive: if called unprimed, self-prime on provided stamp or 0
-                base = float(last_seen_lsl_stamp or 0.0)
-                self._t_curr = base
-                self._last_wall = base
-                self._anchored = True
-
-            # Optional soft realign on long inactivity
-            if last_seen_lsl_stamp is not None:
-                wall = float(last_seen_lsl_stamp)
-                if wall - self._last_wall >= self._soft_gap_sec:
-                    # Re-anchor to recent wall clock to avoid large drift jumps
-                    self._t_curr = wall
-                self._last_wall = wall
-
-            out = self._t_curr             # Emit current tick
-            self._t_curr = out + self._dt  # Advance by 1/fs
-            return out
+        if not self._anchored:
+            # Defensive: if called unprimed, self-prime on provided stamp or 0
+            base = float(last_seen_lsl_stamp or 0.0)
+            self._t_curr = base
+            self._last_wall = base
+            self._anchored = True
+
+        # Optional soft realign on long inactivity
+        if last_seen_lsl_stamp is not None:
+            wall = float(last_seen_lsl_stamp)
+            if wall - self._last_wall >= self._soft_gap_sec:
+                # Re-anchor to recent wall clock to avoid large drift jumps
+                self._t_curr = wall
+            self._last_wall = wall
+
+        out = self._t_curr             # Emit current tick
+        self._t_curr = out + self._dt  # Advance by 1/fs
+        return out
+
+    def next_tick_block(self, lsl_stamps) -> np.ndarray:
+        """Return deterministic ts for a whole chunk (one arange per segment).
+
+        Same soft-realign rule as next_tick, checked for every stamp: the chunk is
+        split where a stamp jumps >= soft gap past its predecessor and each segment
+        restarts at that stamp. Ticks are base + k/fs (no accumulated additions).
+        """
+        walls = np.asarray(lsl_stamps, dtype=np.float64)
+        n = walls.shape[0]
+        if n == 0:
+            return np.empty(0, dtype=np.float64)
+        if not self._anchored:
+            # Defensive: if called unprimed, self-prime on the first stamp
+            self._t_curr = self._last_wall = float(walls[0])
+            self._anchored = True
+
+        # Inactivity gaps vs. the previous stamp (first compared to the last chunk)
+        prev = np.empty_like(walls)
+        prev[0] = self._last_wall
+        prev[1:] = walls[:-1]
+        jumps = np.flatnonzero(walls - prev >= self._soft_gap_sec)
+
+        steps = np.arange(n, dtype=np.float64) * self._dt
+        if jumps.size == 0:
+            out = self._t_curr + steps                   # Common case: one segment
+        else:
+            out = np.empty(n, dtype=np.float64)
+            bounds = [0, *jumps.tolist(), n]
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                if a == b:
+                    continue                             # Jump on the first stamp
+                base = self._t_curr if a == 0 and jumps[0] != 0 else float(walls[a])
+                out[a:b] = base + steps[:b - a]
+
+        self._t_curr = float(out[-1]) + self._dt        # Next tick after the chunk
+        self._last_wall = float(walls[-1])
+        return out
 
     # ====== INFO ======
     @property
@@ -1,5 +1,6 @@
 # export/export_sink.py
 # CSV exporter sink: wide synced CSV (k,t_q,channels...,spike,event) + markers sidecar.
+# The synced table can instead be written as Parquet/Feather when pyarrow is installed.
 
 from __future__ import annotations
 
@@ -8,12 +9,65 @@ import threading
 import time
 import queue
 import math  # For ceil on lookahead-sec → steps
-from typing import Dict, List, Optional, Iterable, Any
+import heapq
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Iterable, Any, Tuple
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 from utils.config import CONFIG
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except Exception:  # Optional: only needed for export.OUT.SYNCED_FORMAT parquet/feather
+    pa = None
+    pq = None
+    ARROW_AVAILABLE = False
+
+_IO_BUFFER_BYTES = 1 << 20  # User-space buffer per CSV file (bytes written per os.write)
+_OPEN_FLAGS = os.O_CREAT | os.O_WRONLY | os.O_TRUNC | getattr(os, "O_BINARY", 0)  # O_BINARY: Windows only
+_DRAIN_MAX = 4096           # Packets handled per wake before commit/flush bookkeeping
+_FMT_CACHE_MAX = 8192       # Formatted sample values kept; oldest half evicted on overflow
+_EOL = "\r\n"               # csv.writer's default terminator, kept so files stay byte-compatible
+_CSV_SPECIAL = frozenset(',"\r\n')
+_FLUSH = ("__flush__",)     # Writer-queue token: write every buffered byte now
+_ARROW_BATCH_ROWS = 65536   # Rows per Arrow record batch (= Parquet row group) outside explicit flushes
+_WRITE_Q_MAX = 256          # Hand-offs queued for the writer thread before the consumer waits
+_WRITER_STALL_S = 2.0       # Wait for a full writer queue before dropping that hand-off
+_WRITER_JOIN_S = 5.0        # Bound on waiting for the writer at stop() (stalled disk/mount)
+
+
+def _write_all(fd: int, buf: bytearray) -> None:
+    """os.write the whole buffer (short writes are legal), then drop what was written."""
+    done = 0
+    view = memoryview(buf)
+    try:
+        while done < len(view):
+            done += os.write(fd, view[done:])
+    finally:
+        view.release()
+        del buf[:done]
+
+
+def _arrow_val(v: Any) -> Optional[float]:
+    """Cell for a float64 Arrow column: None and non-numeric text become nulls."""
+    if v is None:
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _csv_field(s: str) -> str:
+    """Quote a text cell like csv QUOTE_MINIMAL (numbers never need it; labels rarely do)."""
+    if _CSV_SPECIAL.isdisjoint(s):
+        return s
+    return '"' + s.replace('"', '""') + '"'
+
+
 # ====== TYPES ======
 # Packet tags from SyncManager:
 #   ("sample", k, t_q, device, ((ch,val), ...))
@@ -26,8 +80,11 @@ class ExportSink:
     Synced CSV columns (in order): k, t_q, [dev:ch...], spike, event.
     Markers CSV columns: k, t_q, event, spike, source.
 
-    Fixed lookahead L (in steps) for late handling; late ≤ commit → drop late.
-    Flush triggers: every T seconds or after N committed rows.
+    Fixed lookahead L (in steps) for late handling; late ≤ commit → drop late
+    (sample cells and spike slot only; late markers are still written).
+    Flush triggers: every T seconds or after N committed rows. Rows are joined
+    into CSV lines at commit (labels pre-escaped on arrival), batched in memory
+    and written as one encoded block per file at flush.
     """
 
     # --- Construction / lifecycle ---
@@ -45,8 +102,12 @@ class ExportSink:
         idle_watermark_sec: Optional[float] = None,
     ) -> None:
         # Runtime queues/state
-        self.q: "queue.Queue[tuple]" = queue.Queue(maxsize=0)   # Unbounded queue
-        self._stop = threading.Event()
+        # Unbounded C-level FIFO: no Python Condition/lock round-trip per put/get. Not SPSC:
+        # SYNC's consumer thread (samples) and the keyboard thread (events/spikes) both put.
+        self.q: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        # Plain flag (read once per wake; no waiter needs an Event): the "__stop__"
+        # sentinel unblocks the queue get, worst case is one extra loop.
+        self._stop_flag: bool = False
         self._thr: Optional[threading.Thread] = None
 
         # Timing / grid
@@ -108,6 +169,10 @@ class ExportSink:
             self._flush_rows_threshold = raw_rows                # Fixed positive threshold
 
 
+        # Periodic/row-count triggers hand batched rows to the 1 MiB file buffers; only
+        # FLUSH_ON_PERIOD also forces them to the OS (else: idle watermark and stop).
+        self._flush_on_period: bool = bool(exp_cfg.get("FLUSH_ON_PERIOD", False))
+
         # --- Idle watermark (C): finalize on inactivity ---
         # If no packets for X seconds, commit to k_seen_max and flush.
         self._idle_watermark_sec: float = float(
@@ -126,7 +191,17 @@ class ExportSink:
         markers_dir = out_cfg.get("MARKERS_DIR", "data/markers")
         os.makedirs(synced_dir, exist_ok=True)
         os.makedirs(markers_dir, exist_ok=True)
-        self._synced_path = os.path.join(synced_dir, f"synced_{ts_str}.csv")
+        # Synced table format: "csv" (default) or columnar "parquet"/"feather" (needs pyarrow)
+        synced_format = str(out_cfg.get("SYNCED_FORMAT", "csv")).lower()
+        if synced_format not in ("csv", "parquet", "feather"):
+            logger.warning("Export: unknown SYNCED_FORMAT=%r, using csv", synced_format)
+            synced_format = "csv"
+        elif synced_format != "csv" and not ARROW_AVAILABLE:
+            logger.warning("Export: SYNCED_FORMAT=%s requires pyarrow, using csv", synced_format)
+            synced_format = "csv"
+        self._synced_format: str = synced_format
+        self._arrow: bool = synced_format != "csv"
+        self._synced_path = os.path.join(synced_dir, f"synced_{ts_str}.{synced_format}")
         self._markers_path = os.path.join(markers_dir, f"markers_{ts_str}.csv")
 
         # Per-CSV enable flags (note: keys intentionally match config spelling)
@@ -136,30 +211,66 @@ class ExportSink:
         # Header / columns
         self._channels: List[str] = list(known_channels) if known_channels else []
         self._header_frozen = bool(self._channels)              # Freeze if provided
+        # Column slot per "dev:ch" key; open rows are lists of width+1 cells (last = spike)
+        # holding raw sample values (None = gap); formatting is deferred to commit
+        self._ch_index: Dict[str, int] = {c: i for i, c in enumerate(self._channels)}
+        self._row_width: int = len(self._channels)
+        # Per-device ch -> slot tables derived from _ch_index on first sight of a device,
+        # so ingest resolves a pair with one dict lookup and no "dev:ch" string build.
+        self._dev_slots: Dict[str, Dict[str, int]] = {}
+
+        # Committed cells: CSV gets formatted/escaped text, Arrow gets typed raw values
+        self._cell = _arrow_val if self._arrow else self._fmt_val_cached
+        self._text_cell = str if self._arrow else _csv_field
+        # Row builders specialized once on format and PRINT_K (no per-row branches)
+        self._build_row, self._build_marker = self._make_row_builders()
 
         # Sticky event defaults (match SyncManager rule)
         ev_map = CONFIG.get("events", {}).get("EVENT_KEYMAP", {})
         try:
-            self._default_event = str(next(iter(ev_map.values())))
+            self._default_event = self._text_cell(str(next(iter(ev_map.values()))))
         except StopIteration:
             self._default_event = ""
         self._sticky_event = self._default_event                # Current sticky event
 
-        # Row buffer and aux state
-        self._open_rows: Dict[int, Dict[str, str]] = {}         # k -> col->val
-        self._tq_by_k: Dict[int, float] = {}                    # k -> t_q
-        self._event_changes: Dict[int, str] = {}                # k -> event label
+        # Row buffer: ring of open rows indexed by k % size. Live ks are always
+        # k_committed+1 .. k_committed+size, so commit is a contiguous walk (no sort).
+        self._k_committed: int = -1                             # Last k handed to the row batch
+        self._ring_size: int = self._L + 64                     # >= L + 2 so open rows never collide
+        self._ring_rows: List[Optional[List[Any]]] = [None] * self._ring_size  # [raw ch values..., spike]
+        self._ring_tq: List[float] = [0.0] * self._ring_size    # t_q of each open row
+        # Pending sticky-event changes as a min-heap of (k, arrival seq, label); the seq
+        # keeps same-k changes in arrival order so the latest one wins, as before.
+        self._event_heap: List[Tuple[int, int, str]] = []
+        self._event_seq: int = 0
         self._pending_committed: int = 0                        # Rows since last flush
+        self._row_batch: List[Any] = []                         # Committed synced lines (CSV) or rows (Arrow)
+        self._marker_batch: List[str] = []                      # Marker lines, written at flush
         self._last_flush_time: float = time.monotonic()         # Periodic flush clock
+        self._fmt_cache: Dict[float, str] = {}                  # value -> formatted cell (quantized repeats)
 
         # Initial marker state
         self._initial_marker_emitted: bool = False              # Emit default event at first commit
 
-        # IO objects
-        self._synced_fh = None
-        self._synced_writer: Optional[Any] = None
-        self._markers_fh = None
-        self._markers_writer: Optional[Any] = None
+        # Packet tag -> handler ("__stop__" is checked before the lookup)
+        self._handlers = {
+            "sample": self._on_sample,                          # Update buffers
+            "event": self._on_event,                            # Update sticky + markers
+            "spike": self._on_spike,                            # Mark spike + markers
+        }
+
+        # IO: raw file descriptors (no io stack; lines are formatted by hand, no csv module).
+        # CSV bytes are handed to a writer thread that buffers them and owns every os.write,
+        # so commits never wait on the kernel.
+        self._synced_fd: Optional[int] = None
+        self._markers_fd: Optional[int] = None
+        self._synced_on: bool = False                           # Synced table open (CSV fd or Arrow writer)
+        self._arrow_schema: Optional[Any] = None
+        self._arrow_writer: Optional[Any] = None
+        self._write_q: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=_WRITE_Q_MAX)  # (fd, bytes) | _FLUSH | None
+        self._write_backlogged = False                          # Writer queue seen full (warned once)
+        self._write_dropped = 0                                 # Hand-offs dropped on a stalled writer
+        self._writer_thr: Optional[threading.Thread] = None
 
 
     # --- Public API ---
@@ -170,48 +281,51 @@ class ExportSink:
             return
 
         # Open output files (paths prepared in __init__)
-        # Use newline="" to prevent extra blank lines on Windows CSV.
+        # Raw fds: line endings are explicit (_EOL); the 1 MiB byte buffers turn many
+        # small batch writes into few large os.write() calls.
         if self._csv_signal_enabled:
-            self._synced_fh = open(self._synced_path, "w", newline="", encoding="utf-8")
+            if self._arrow:
+                self._open_arrow_writer()
+            else:
+                self._synced_fd = os.open(self._synced_path, _OPEN_FLAGS, 0o644)
+            self._synced_on = True
         else:
-            self._synced_fh = None
+            self._synced_fd = None
         if self._csv_marker_enabled:
-            self._markers_fh = open(self._markers_path, "w", newline="", encoding="utf-8")
+            self._markers_fd = os.open(self._markers_path, _OPEN_FLAGS, 0o644)
         else:
-            self._markers_fh = None
-
-        # Create CSV writers
-        import csv  # Local import keeps top clean and avoids shadowing issues
-        self._synced_writer = csv.writer(self._synced_fh) if self._synced_fh is not None else None
-        self._markers_writer = csv.writer(self._markers_fh) if self._markers_fh is not None else None
+            self._markers_fd = None
 
         # Log enablement state for each CSV
-        if self._csv_signal_enabled and self._synced_fh is not None:
-            logger.info("Export: signal CSV enabled -> %s", self._synced_path)
+        if self._csv_signal_enabled and self._synced_on:
+            logger.info("Export: signal %s enabled -> %s", self._synced_format, self._synced_path)
         else:
             logger.info("Export: signal CSV disabled")
-        if self._csv_marker_enabled and self._markers_fh is not None:
+        if self._csv_marker_enabled and self._markers_fd is not None:
             logger.info("Export: marker CSV enabled -> %s", self._markers_path)
         else:
             logger.info("Export: marker CSV disabled")
 
         # Write markers header immediately (stable schema)
-        if self._markers_writer is not None:
+        if self._markers_fd is not None:
             hdr = (["k"] if self._print_k else []) + ["t_q", "event", "spike", "source"]
-            self._markers_writer.writerow(hdr)
+            self._hand_off((self._markers_fd, (",".join(hdr) + _EOL).encode("utf-8")))
 
         # Always write the synced header now, using channels provided by main.
-        if self._synced_writer is not None:
+        if self._synced_on:
             if not self._channels:
                 # Safety net: main should have already failed earlier if empty
                 raise RuntimeError("ExportSink: no known_channels provided by main")
-            header = (["k"] if self._print_k else []) + ["t_q"] + list(self._channels) + ["spike", "event"]
-            self._synced_writer.writerow(header)
+            if self._synced_fd is not None:                 # Arrow: the schema is the header
+                header = (["k"] if self._print_k else []) + ["t_q"] + [_csv_field(c) for c in self._channels] + ["spike", "event"]
+                self._hand_off((self._synced_fd, (",".join(header) + _EOL).encode("utf-8")))
             self._header_frozen = True  # Freeze schema strictly to provided channels
 
 
-        # Start consumer thread (daemon so process can exit cleanly)
-        self._stop.clear()
+        # Start writer and consumer threads (daemon so process can exit cleanly)
+        self._writer_thr = threading.Thread(target=self._writer_loop, name="ExportSinkWriter", daemon=True)
+        self._writer_thr.start()
+        self._stop_flag = False
         self._thr = threading.Thread(target=self._run, name="ExportSink", daemon=True)
         self._thr.start()
 
@@ -219,82 +333,134 @@ class ExportSink:
         """Request stop, flush remaining, and close files."""
         if self._thr is None:
             return
-        self._stop.set()
+        self._stop_flag = True
         try:
             self.q.put_nowait(("__stop__",))
         except Exception:
             pass
         self._thr.join(timeout=2.0)
         self._thr = None
-        # Final flush best-effort
+        # Final flush best-effort (hands over batched rows), then let the writer drain and exit
         self._commit_until(self._k_seen_max)
-        # Close files
+        self._flush_io()
+        writer_stuck = False
+        if self._writer_thr is not None:
+            self._hand_off(None)
+            self._writer_thr.join(timeout=_WRITER_JOIN_S)
+            writer_stuck = self._writer_thr.is_alive()
+            if writer_stuck:
+                logger.warning(
+                    "Export: writer thread still busy after %.1fs (stalled disk?); files left open and may be incomplete",
+                    _WRITER_JOIN_S,
+                )
+            self._writer_thr = None
+        if self._write_dropped:
+            logger.error("Export: %d write batches dropped on a stalled writer", self._write_dropped)
+        # Sync to disk once and close files
+        self._synced_on = False
         try:
-            if self._synced_fh:
-                self._synced_fh.flush()
-                self._synced_fh.close()
+            if self._arrow_writer is not None:
+                self._arrow_writer.close()                  # Writes the Parquet/Feather footer
         finally:
-            self._synced_fh = None
-            self._synced_writer = None
+            self._arrow_writer = None
+        if writer_stuck:
+            return                                          # Never close fds under an in-flight os.write
         try:
-            if self._markers_fh:
-                self._markers_fh.flush()
-                self._markers_fh.close()
+            if self._synced_fd is not None:
+                os.fsync(self._synced_fd)
+                os.close(self._synced_fd)
         finally:
-            self._markers_fh = None
-            self._markers_writer = None
+            self._synced_fd = None
+        try:
+            if self._markers_fd is not None:
+                os.fsync(self._markers_fd)
+                os.close(self._markers_fd)
+        finally:
+            self._markers_fd = None
 
     # --- Internal loop ---
     def _run(self) -> None:
-        """Drain queue; process packets; periodic flush by time/rows."""
-        while not self._stop.is_set():
-            # Timed wait to allow periodic flush cadence
-            timeout = max(0.02, self._flush_period * 0.5)  # Small latency
+        """Drain queue in batches; process packets; periodic flush by time/rows."""
+        # Loop invariants hoisted into locals (fixed after __init__)
+        q_get = self.q.get
+        get_nowait = self.q.get_nowait
+        handlers = self._handlers
+        monotonic = time.monotonic
+        lookahead = self._L
+        flush_period = self._flush_period
+        flush_rows = self._flush_rows_threshold
+        flush_on_period = self._flush_on_period
+        idle_wm = self._idle_watermark_sec
+        timeout = max(0.02, flush_period * 0.5)             # Timed wait keeps the flush cadence
+
+        while not self._stop_flag:
             try:
-                pkt = self.q.get(timeout=timeout)
+                pkt = q_get(timeout=timeout)
             except queue.Empty:
                 pkt = None
 
-            now = time.monotonic()                          # Monotonic snapshot
+            now = monotonic()                               # Monotonic snapshot
 
             if pkt is not None:
                 self._last_activity_monotonic = now         # Update activity timestamp
-                tag = pkt[0]
-                if tag == "__stop__":
+
+            # One guard per drain cycle (not per packet): a malformed packet is logged and
+            # dropped; packets still queued are handled on the next wake.
+            try:
+                # Handle the woken packet plus whatever is already queued (capped, so a hot
+                # producer cannot starve the commit/flush cadence below).
+                stopping = False
+                drained = 0
+                anchor_pending = self._synced_on and not self._initial_marker_emitted
+                while pkt is not None:
+                    tag = pkt[0]
+                    if tag == "__stop__":
+                        stopping = True
+                        break
+                    h = handlers.get(tag)
+                    if h is not None:
+                        h(pkt)
+                    if anchor_pending:
+                        # Until the initial "sync" marker is out, commit per packet as before
+                        # batching, so it keeps its place at the top of the markers file.
+                        self._commit_until(self._k_seen_max - lookahead)
+                        anchor_pending = not self._initial_marker_emitted
+                    drained += 1
+                    if drained >= _DRAIN_MAX:
+                        break
+                    try:
+                        pkt = get_nowait()
+                    except queue.Empty:
+                        pkt = None
+                if stopping:
                     break
-                try:
-                    if tag == "sample":
-                        self._on_sample(pkt)               # Update buffers
-                    elif tag == "event":
-                        self._on_event(pkt)                # Update sticky + markers
-                    elif tag == "spike":
-                        self._on_spike(pkt)                # Mark spike + markers
-                except Exception:
-                    # Robustness: ignore malformed packet
-                    pass
-
-            # Commit up to k_commit using fixed lookahead
-            k_commit = self._k_seen_max - self._L
-            self._commit_until(k_commit)
-
-            # --- Idle watermark (C): if idle for long, finalize to k_seen_max ---
-            if self._idle_watermark_sec > 0.0:
-                idle_for = now - self._last_activity_monotonic
-                if idle_for >= self._idle_watermark_sec:
-                    # Commit everything seen so far; then flush I/O
-                    self._commit_until(self._k_seen_max)
-                    self._flush_io()
-                    # Bump the activity timestamp to avoid repeated flush loops
-                    self._last_activity_monotonic = now
-
-            # Periodic flush (IO)
-            if (
-                now - self._last_flush_time >= self._flush_period
-                or self._pending_committed >= self._flush_rows_threshold
-            ):
-                self._flush_io()
-                self._last_flush_time = now
-                self._pending_committed = 0
+
+                # Commit up to k_commit using fixed lookahead
+                self._commit_until(self._k_seen_max - lookahead)
+
+                # --- Idle watermark (C): if idle for long, finalize to k_seen_max ---
+                if idle_wm > 0.0:
+                    idle_for = now - self._last_activity_monotonic
+                    if idle_for >= idle_wm:
+                        # Commit everything seen so far; then flush I/O
+                        self._commit_until(self._k_seen_max)
+                        self._flush_io()
+                        # Bump the activity timestamp to avoid repeated flush loops
+                        self._last_activity_monotonic = now
+
+                # Periodic hand-off of batched rows (IO flush only if FLUSH_ON_PERIOD)
+                if (
+                    now - self._last_flush_time >= flush_period
+                    or self._pending_committed >= flush_rows
+                ):
+                    if flush_on_period:
+                        self._flush_io()
+                    elif self._row_batch or self._marker_batch:
+                        self._write_batches()                   # Nothing batched: skip the call
+                    self._last_flush_time = now
+                    self._pending_committed = 0
+            except Exception as e:
+                logger.exception("Export: drain cycle failed: %s", e)
 
         # Final IO flush on exit
         self._flush_io()
@@ -303,16 +469,21 @@ class ExportSink:
     def _on_sample(self, pkt: tuple) -> None:
         """Handle ("sample", k, t_q, device, pairs). Latest-wins in bucket."""
         _, k, t_q, dev, pairs = pkt
-        self._k_seen_max = max(self._k_seen_max, int(k))
-        self._tq_by_k[int(k)] = float(t_q)
-        row = self._open_rows.setdefault(int(k), {})
+        k = int(k)
+        self._k_seen_max = max(self._k_seen_max, k)
+        row = self._open_row(k, float(t_q))
+        if row is None:
+            return                                         # Late (already committed) or CSV off
 
         # Strict schema: only write channels provided by main; ignore others
+        slots = self._dev_slots.get(dev)
+        if slots is None:
+            slots = self._device_slots(dev)
         for ch, val in pairs:
-            key = f"{dev}:{ch}"
-            if key not in self._channels:
+            i = slots.get(ch)
+            if i is None:
                 continue  # Ignore channels outside the fixed header
-            row[key] = self._fmt_val(val)  # Latest-wins
+            row[i] = val                 # Raw value, latest-wins (formatted once at commit)
 
         # If header not yet written but channels are known enough, write it now
         if not self._header_frozen:
@@ -323,28 +494,54 @@ class ExportSink:
         _, k, t_q, _label, source, current_after = pkt
         k = int(k)
         t_q = float(t_q)
+        raw = str(current_after)
+        label = self._text_cell(raw)                       # Converted once; reused by every row
         # Record change for sticky propagation during commit (do not advance now)
-        self._event_changes[k] = str(current_after)        # Change takes effect at k
+        self._event_seq += 1
+        heapq.heappush(self._event_heap, (k, self._event_seq, label))  # Change takes effect at k
         # Emit markers row now (low volume, no lookahead)
-        self._write_marker(k, t_q, event=str(current_after), spike="", source=str(source))
+        self._write_marker(k, t_q, event=_csv_field(raw), spike="", source=_csv_field(str(source)))
 
     def _on_spike(self, pkt: tuple) -> None:
         """Handle ("spike", k, t_q, label, source). Latest-wins if multiple."""
         _, k, t_q, label, source = pkt
         k = int(k)
         t_q = float(t_q)
-        row = self._open_rows.setdefault(k, {})
-        row["spike"] = str(label)                          # Latest-wins for same k
-        self._tq_by_k[k] = t_q
+        raw = str(label)
+        row = self._open_row(k, t_q)
+        if row is not None:
+            row[self._row_width] = self._text_cell(raw)    # Spike slot; latest-wins for same k
         self._k_seen_max = max(self._k_seen_max, k)
         # Emit markers row now
-        self._write_marker(k, t_q, event="", spike=str(label), source=str(source))
+        self._write_marker(k, t_q, event="", spike=_csv_field(raw), source=_csv_field(str(source)))
+
+    def _device_slots(self, dev: str) -> Dict[str, int]:
+        """Build (once per device) the ch -> column slot table from the "dev:ch" header keys."""
+        prefix = f"{dev}:"
+        slots = {key[len(prefix):]: i for key, i in self._ch_index.items() if key.startswith(prefix)}
+        self._dev_slots[dev] = slots
+        return slots
 
     # --- Commit / flush helpers ---
+    def _open_row(self, k: int, t_q: float) -> Optional[List[Any]]:
+        """Return the open row for k (created on first use); None if k is late or CSV is off."""
+        if not self._synced_on or k <= self._k_committed:
+            return None                                    # Late: its row is already written
+        size = self._ring_size
+        if k - self._k_committed > size:
+            # Grid jump (e.g. after a pause): every open row is older than k - L anyway
+            self._commit_until(k - size)
+        i = k % size
+        row = self._ring_rows[i]
+        if row is None:
+            row = self._ring_rows[i] = [None] * (self._row_width + 1)
+        self._ring_tq[i] = t_q
+        return row
+
     def _commit_until(self, k_commit: int) -> None:
-        """Write rows for all k ≤ k_commit; drop late arrivals thereafter."""
-        # Writer must exist; otherwise nothing to do.
-        if self._synced_writer is None:
+        """Write rows for all open k ≤ k_commit; later arrivals for those k are dropped."""
+        # Output must be open; otherwise nothing to do.
+        if not self._synced_on:
             return
 
         # Ensure header exists before writing any row.
@@ -356,82 +553,270 @@ class ExportSink:
                 return
             self._write_synced_header()
 
-        # If there is no pending time index, nothing to commit.
-        if not self._open_rows and not self._tq_by_k:
+        # Walk the open window in k order; slots past k_committed+size cannot be live.
+        k_lo = self._k_committed + 1
+        if k_commit < k_lo:
             return
-
-        # Collect ks to commit in order (≤ k_commit).
-        ks = sorted(k for k in self._tq_by_k.keys() if k <= k_commit)
-
-        for k in ks:
-            t_q = self._tq_by_k.get(k, k * self._delta)  # Fallback uses grid
-
-            # Apply any sticky-event changes up to and including this k.
-            if self._event_changes:
-                pending = [kk for kk in self._event_changes.keys() if kk <= k]
-                if pending:
-                    for kk in sorted(pending):
-                        self._sticky_event = self._event_changes[kk]
-                        self._event_changes.pop(kk, None)
+        size = self._ring_size
+        ring_rows = self._ring_rows
+        ev_heap = self._event_heap
+        build_row = self._build_row
+        k_hi = min(k_commit, self._k_committed + size)
+
+        for k in range(k_lo, k_hi + 1):
+            i = k % size
+            cells = ring_rows[i]
+            if cells is None:
+                continue                           # No sample/spike at this k
+            ring_rows[i] = None
+            t_q = self._ring_tq[i]
+            spike = cells.pop()                    # Spike slot: text cell or None
+
+            # Apply any sticky-event changes up to and including this k (heap head = oldest).
+            while ev_heap and ev_heap[0][0] <= k:
+                self._sticky_event = heapq.heappop(ev_heap)[2]
 
             # Emit initial marker exactly once at the first committed k.
             if not self._initial_marker_emitted:
-                self._write_marker(k, t_q, event=self._sticky_event, spike="", source="sync")
+                initial = _csv_field(self._sticky_event) if self._arrow else self._sticky_event
+                self._write_marker(k, t_q, event=initial, spike="", source="sync")
                 self._initial_marker_emitted = True
 
-            # Build the CSV row for this k.
-            row_map = self._open_rows.pop(k, {})  # Might be empty if only markers
-            row: List[str] = (([str(k)] if self._print_k else []) + [self._fmt_val(t_q)])
-            for ch in self._channels:
-                row.append(row_map.get(ch, ""))    # Empty cell for missing values
-            row.append(row_map.get("spike", ""))   # Spike is only set at its k
-            row.append(self._sticky_event)         # Current sticky event at this k
-
-            # Write the row and advance counters/cleanup.
-            self._synced_writer.writerow(row)
-            self._tq_by_k.pop(k, None)
+            # Queue the row for this k (CSV line or typed Arrow row, written at flush):
+            # channel cells, spike (only set at its k), current sticky event.
+            self._row_batch.append(build_row(k, t_q, cells, spike, self._sticky_event))
             self._pending_committed += 1
+        self._k_committed = k_commit
 
         # Cleanup any leftover event changes already committed (safety).
-        for kk in list(self._event_changes.keys()):
-            if kk <= k_commit:
-                self._event_changes.pop(kk, None)
+        while ev_heap and ev_heap[0][0] <= k_commit:
+            heapq.heappop(ev_heap)
+
+    def _write_batches(self) -> None:
+        """Encode batched lines and hand them to the writer thread (it writes at 1 MiB)."""
+        try:
+            if self._row_batch:
+                if self._arrow_writer is not None:
+                    # Arrow: accumulate into large record batches (few, big row groups)
+                    if len(self._row_batch) >= _ARROW_BATCH_ROWS:
+                        self._write_arrow_rows()
+                else:
+                    if self._synced_fd is not None:
+                        self._hand_off((self._synced_fd, (_EOL.join(self._row_batch) + _EOL).encode("utf-8")))
+                    self._row_batch.clear()
+            if self._marker_batch:
+                if self._markers_fd is not None:
+                    self._hand_off((self._markers_fd, (_EOL.join(self._marker_batch) + _EOL).encode("utf-8")))
+                self._marker_batch.clear()
+        except Exception as e:
+            logger.error("Export: batch hand-off failed: %s", e, exc_info=True)
 
     def _flush_io(self) -> None:
-        """Flush file handles to ensure data is persisted periodically."""
+        """Hand over batched rows, then ask the writer to push its buffers to the OS."""
+        self._write_batches()
         try:
-            if self._synced_fh:
-                self._synced_fh.flush()
-            if self._markers_fh:
-                self._markers_fh.flush()
-        except Exception:
-            pass
+            if self._arrow_writer is not None and self._row_batch:
+                self._write_arrow_rows()
+        except Exception as e:
+            logger.error("Export: synced flush failed: %s", e, exc_info=True)
+        self._hand_off(_FLUSH)
+
+    def _hand_off(self, item: Optional[tuple]) -> None:
+        """Queue bytes/_FLUSH/None for the writer; wait briefly if it backs up, then drop and count."""
+        try:
+            self._write_q.put_nowait(item)
+            self._write_backlogged = False
+            return
+        except queue.Full:
+            if not self._write_backlogged:                  # Once per backlog episode
+                self._write_backlogged = True
+                logger.warning("Export: writer queue full (%d hand-offs); waiting for the disk", _WRITE_Q_MAX)
+        try:
+            self._write_q.put(item, timeout=_WRITER_STALL_S)
+        except queue.Full:
+            self._write_dropped += 1
+            logger.error("Export: writer stalled for %.1fs; dropping a write batch", _WRITER_STALL_S)
+
+    def _writer_loop(self) -> None:
+        """Writer thread: coalesce handed-off bytes per fd; os.write at 1 MiB, on _FLUSH and at exit."""
+        bufs: Dict[int, bytearray] = {}
+        get = self._write_q.get
+
+        def write_out(fd: int, buf: bytearray) -> None:
+            try:
+                _write_all(fd, buf)
+            except OSError as e:
+                logger.error("Export: write failed (fd=%d): %s", fd, e)
+                buf.clear()                                 # Drop rather than grow without bound
+
+        while True:
+            item = get()
+            if item is None or item is _FLUSH:
+                for fd, buf in bufs.items():
+                    if buf:
+                        write_out(fd, buf)
+                if item is None:
+                    break                                   # Stop sentinel: everything is written
+                continue
+            fd, data = item
+            buf = bufs.get(fd)
+            if buf is None:
+                buf = bufs[fd] = bytearray()
+            buf += data
+            if len(buf) >= _IO_BUFFER_BYTES:
+                write_out(fd, buf)
 
     # --- IO helpers ---
+    def _open_arrow_writer(self) -> None:
+        """Build the synced schema (k?, t_q, channels as float64, spike, event) and open the writer."""
+        fields = ([pa.field("k", pa.int64())] if self._print_k else []) + [pa.field("t_q", pa.float64())]
+        fields += [pa.field(c, pa.float64()) for c in self._channels]
+        fields += [pa.field("spike", pa.string()), pa.field("event", pa.string())]
+        self._arrow_schema = pa.schema(fields)
+        if self._synced_format == "parquet":
+            self._arrow_writer = pq.ParquetWriter(self._synced_path, self._arrow_schema)
+        else:
+            self._arrow_writer = pa.ipc.new_file(self._synced_path, self._arrow_schema)  # Feather v2
+
+    def _write_arrow_batch(self) -> None:
+        """Transpose batched rows into typed columns and write them as one record batch."""
+        schema = self._arrow_schema
+        arrays = [pa.array(col, type=f.type) for col, f in zip(zip(*self._row_batch), schema)]
+        self._arrow_writer.write_batch(pa.record_batch(arrays, schema=schema))
+        self._row_batch.clear()
+
+    def _write_arrow_rows(self) -> None:
+        """Write the batched rows as one record batch; on any Arrow error, continue as CSV."""
+        try:
+            self._write_arrow_batch()
+        except Exception as e:
+            logger.error(
+                "Export: %s write failed (%s); switching synced output to CSV",
+                self._synced_format, e, exc_info=True,
+            )
+            self._fallback_to_csv()
+
+    def _fallback_to_csv(self) -> None:
+        """Reopen the synced output as CSV (same basename) and re-encode every pending Arrow row.
+
+        Rows already in the Arrow file stay there; nothing batched or still open is lost.
+        """
+        try:
+            self._arrow_writer.close()
+        except Exception as e:
+            logger.warning("Export: closing the %s writer failed: %s", self._synced_format, e)
+        self._arrow_writer = None
+        self._arrow = False
+        self._synced_path = os.path.splitext(self._synced_path)[0] + ".csv"
+        try:
+            self._synced_fd = os.open(self._synced_path, _OPEN_FLAGS, 0o644)
+        except OSError as e:
+            logger.error("Export: cannot open fallback CSV %s: %s", self._synced_path, e)
+            self._synced_on = False                          # Nowhere to write: stop collecting rows
+            self._row_batch.clear()
+            return
+        logger.warning("Export: synced output continues as CSV -> %s", self._synced_path)
+
+        # Text cells were kept raw for Arrow; CSV needs them escaped
+        self._cell = self._fmt_val_cached
+        self._text_cell = _csv_field
+        self._build_row, self._build_marker = self._make_row_builders()
+        self._sticky_event = _csv_field(self._sticky_event)
+        self._event_heap = [(k, seq, _csv_field(label)) for k, seq, label in self._event_heap]
+        spike_slot = self._row_width
+        for row in self._ring_rows:
+            if row is not None and row[spike_slot] is not None:
+                row[spike_slot] = _csv_field(row[spike_slot])
+
+        # Header, then the typed rows that were waiting for the next record batch
+        fmt = self._fmt_val
+        n_head = 2 if self._print_k else 1
+        header = (["k"] if self._print_k else []) + ["t_q"] + [_csv_field(c) for c in self._channels] + ["spike", "event"]
+        lines = [",".join(header)]
+        for r in self._row_batch:
+            head = [str(r[0]), fmt(r[1])] if self._print_k else [fmt(r[0])]
+            spike, event = r[-2], r[-1]
+            lines.append(",".join([
+                *head, *map(fmt, r[n_head:-2]), _csv_field(spike) if spike else "", _csv_field(event),
+            ]))
+        self._row_batch.clear()
+        self._hand_off((self._synced_fd, (_EOL.join(lines) + _EOL).encode("utf-8")))
+
     def _write_synced_header(self) -> None:
         """No-op if channels were not provided; header is written in start()."""
-        if self._synced_writer is None or self._header_frozen:
+        if self._synced_fd is None or self._header_frozen:
             return
         if not self._channels:
             return
-        header = ["k", "t_q"] + list(self._channels) + ["spike", "event"]
-        self._synced_writer.writerow(header)
+        header = ["k", "t_q"] + [_csv_field(c) for c in self._channels] + ["spike", "event"]
+        self._hand_off((self._synced_fd, (",".join(header) + _EOL).encode("utf-8")))
         self._header_frozen = True
 
 
     def _write_marker(self, k: int, t_q: float, *, event: str, spike: str, source: str) -> None:
-        """Write a single marker row immediately (no lookahead, low volume)."""
-        if self._markers_writer is None:
+        """Queue a single marker line (no lookahead, low volume); written at the next flush.
+
+        event/spike/source must already be CSV-escaped (see _csv_field).
+        """
+        if self._markers_fd is None:
             return
-        row = (([str(k)] if self._print_k else []) + [self._fmt_val(t_q), event, spike, source])
-        self._markers_writer.writerow(row)
+        self._marker_batch.append(self._build_marker(k, t_q, event, spike, source))
+
+    def _make_row_builders(self) -> Tuple[Callable[..., Any], Callable[..., str]]:
+        """Return (build_row, build_marker) specialized on format and PRINT_K (fixed at construction).
+
+        build_row(k, t_q, cells, spike, event) -> CSV line or typed Arrow row (cells = raw values);
+        build_marker(k, t_q, event, spike, source) -> CSV line.
+        """
+        cell = self._cell
+        fmt = self._fmt_val
+        if self._arrow:
+            if self._print_k:
+                def build_row(k, t_q, cells, spike, event):
+                    return [k, t_q, *map(cell, cells), spike, event]
+            else:
+                def build_row(k, t_q, cells, spike, event):
+                    return [t_q, *map(cell, cells), spike, event]
+        elif self._print_k:
+            def build_row(k, t_q, cells, spike, event):
+                return ",".join([str(k), fmt(t_q), *map(cell, cells), spike or "", event])
+        else:
+            def build_row(k, t_q, cells, spike, event):
+                return ",".join([fmt(t_q), *map(cell, cells), spike or "", event])
+
+        if self._print_k:
+            def build_marker(k, t_q, event, spike, source):
+                return ",".join((str(k), fmt(t_q), event, spike, source))
+        else:
+            def build_marker(k, t_q, event, spike, source):
+                return ",".join((fmt(t_q), event, spike, source))
+        return build_row, build_marker
+
+    def _fmt_val_cached(self, v: Any) -> str:
+        """_fmt_val for committed sample values, memoized per float (repeated ADC levels hit the dict)."""
+        if not isinstance(v, float):
+            return self._fmt_val(v)                # None/int/text: no caching
+        if v != v or v == 0.0:
+            # NaN never equals itself (every gap would add a key), and 0.0 == -0.0 would
+            # return the other zero's text: format these directly.
+            return f"{v:.6f}"
+        cache = self._fmt_cache
+        s = cache.get(v)
+        if s is None:
+            s = f"{v:.6f}"
+            if len(cache) >= _FMT_CACHE_MAX:
+                # Evict the oldest half (dicts keep insertion order)
+                for old in list(islice(cache, _FMT_CACHE_MAX // 2)):
+                    del cache[old]
+            cache[v] = s
+        return s
 
     @staticmethod
     def _fmt_val(v: float | None) -> str:
-        """Format numbers compactly; map None to empty cell; keep text as-is."""
+        """Format numbers compactly; map None to empty cell; keep text as-is (CSV-escaped)."""
         if v is None:
             return ""  # CSV empty cell for gaps/invalids
         try:
             return f"{float(v):.6f}"
         except Exception:
-            return str(v)
+            return _csv_field(str(v))
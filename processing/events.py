@@ -2,7 +2,8 @@
 # Sticky event state + subscriber broadcast (thread-safe). Keyboard/API triggers.
 
 from __future__ import annotations
-from typing import Callable, Dict, Optional, List, Tuple
+from typing import Callable, Dict, Optional, Tuple
+import sys
 import threading
 import time
 
@@ -17,6 +18,11 @@ logger = get_logger(__name__)
 Subscriber = Callable[[float, str, str, str], None]
 
 
+def _ignore_trigger(*_args, **_kwargs) -> None:
+    """Stand-in for trigger methods when triggers are disabled (see __init__)."""
+    return None
+
+
 # ====== EVENT BUS ======
 class EventBus:
     """Sticky event state with thread-safe notifications.
@@ -34,14 +40,15 @@ class EventBus:
 
         self._enabled = bool(CONFIG.get("events", {}).get("ENABLE_EVENT_TRIGGERS", False))
 
-        # Make a defensive copy of the provided keymap.
-        self._keymap = dict(keymap)
+        # Defensive copy with interned strings: lookups and the toggle compare
+        # against the sticky label then mostly hit the identity fast path.
+        self._keymap = {sys.intern(str(k)): sys.intern(str(v)) for k, v in keymap.items()}
 
         # Pick default: user-provided > first value from keymap > 'REST'.
         if default_name is not None:
-            self._default = default_name
+            self._default = sys.intern(str(default_name))
         else:
-            self._default = list(keymap.values())[0] if keymap else "REST"
+            self._default = next(iter(self._keymap.values()), "REST")
 
         # Log available event labels once (compact, ordered set).
         try:
@@ -51,74 +58,84 @@ class EventBus:
             pass
 
 
-        # Sticky state: name and last change timestamp (monotonic seconds).
-        self._cur_name: str = self._default
-        self._cur_changed_ts: float = time.monotonic()
+        # Sticky state: (name, last change timestamp in monotonic seconds), replaced
+        # as one tuple so readers always see a consistent pair without locking.
+        self._state: Tuple[str, float] = (self._default, time.monotonic())
 
-        # Subscribers and lock for thread-safe access.
-        self._subs: List[Subscriber] = []
+        # Subscribers (copy-on-write tuple: emitters iterate it without the lock)
+        # and lock for thread-safe state updates.
+        self._subs: Tuple[Subscriber, ...] = ()
         self._lock = threading.Lock()
 
+        # Disabled: bind the triggers to a no-op once, so calls skip lookups and logging.
+        if not self._enabled:
+            self.set_by_key = self.set_event = _ignore_trigger  # type: ignore[method-assign]
+
         logger.info("EventBus ready: default=%s enabled=%s", self._default, self._enabled)
 
     # --- Query ---
     def current(self) -> Tuple[str, float]:
         """Return the current sticky event and its last change timestamp."""
-        # Guarded read to keep (name, ts) consistent under concurrent writers.
-        with self._lock:
-            return self._cur_name, self._cur_changed_ts
+        # Lock-free: writers swap the whole tuple, so (name, ts) is always consistent.
+        return self._state
 
     # --- Subscription ---
     def subscribe(self, fn: Subscriber) -> None:
         """Register a subscriber for change notifications."""
         with self._lock:
-            self._subs.append(fn)
+            self._subs = self._subs + (fn,)   # Publish a new tuple; readers keep their snapshot
             logger.info("EventBus: subscriber added (n=%d)", len(self._subs))
 
     # --- Triggers ---
     def set_by_key(self, key: str, source: str = "keyboard") -> None:
         """Toggle event using a key: same key twice returns to default."""
-        # If triggers are disabled, ignore all requests.
-        if not self._enabled:
-            logger.warning("EventBus: ignored key='%s' (triggers disabled)", key)
-            return
-
         # Look up the event name for the pressed key.
         name = self._keymap.get(key)
         if name is None:
             logger.warning("EventBus: unmapped event key='%s'", key)
             return
 
-        # Compute the target: pressing the current event toggles to default.
+        # Capture 'now' with a monotonic clock to avoid wall-clock jumps.
+        now = time.monotonic()
+
+        # Toggle and update in one critical section: pressing the current event
+        # returns to default.
         with self._lock:
-            target = self._default if name == self._cur_name else name
+            target = self._default if name == self._state[0] else name
+            prev = self._swap_locked(target, now)
 
-        # Delegate to the common setter (single change path).
-        self.set_event(target, source=source)
+        if prev is not None:
+            self._notify(now, target, prev, source)
 
     def set_event(self, name: str, source: str = "api") -> None:
         """Set a new event and notify subscribers if it actually changed."""
-        # Respect the global enable flag (keyboard/API unified gate).
-        if not self._enabled:
-            logger.warning("EventBus: ignored event='%s' (triggers disabled)", name)
-            return
-
         # Capture 'now' with a monotonic clock to avoid wall-clock jumps.
         now = time.monotonic()
 
-        # Update sticky state under lock and snapshot subscribers.
+        # Update sticky state under lock.
         with self._lock:
-            prev = self._cur_name
-            if name == prev:
-                return  # No-op if the event is unchanged
-            self._cur_name = name
-            self._cur_changed_ts = now
-            subs = list(self._subs)  # Copy for out-of-lock notifications
-
-        # Notify out of the lock to avoid deadlocks/long critical sections.
-        for fn in subs:
+            prev = self._swap_locked(name, now)
+
+        if prev is not None:
+            self._notify(now, name, prev, source)
+
+    # --- Internal: single change path ---
+    def _swap_locked(self, name: str, now: float) -> Optional[str]:
+        """Install `name` as the sticky event; return the previous one, or None if unchanged.
+
+        Caller must hold self._lock.
+        """
+        prev = self._state[0]
+        if name == prev:
+            return None  # No-op if the event is unchanged
+        self._state = (name, now)
+        return prev
+
+    def _notify(self, ts_s: float, name: str, prev: str, source: str) -> None:
+        """Broadcast a change out of the lock to avoid deadlocks/long critical sections."""
+        for fn in self._subs:
             try:
-                fn(now, name, prev, source)
+                fn(ts_s, name, prev, source)
             except Exception as e:
                 logger.error("EventBus: subscriber failed: %s", e)
 
@@ -134,16 +151,8 @@ class EventBus:
         Use when a perfect, externally-quantized timestamp is available.
         The sticky state (current event) remains untouched by this call.
         """
-        # Snapshot subscribers; no state mutation is performed here.
-        with self._lock:
-            subs = list(self._subs)
-
-        # Notify out of the lock for safety.
-        for fn in subs:
-            try:
-                fn(ts_s, new_event, prev_event, source)
-            except Exception as e:
-                logger.error("EventBus: subscriber failed: %s", e)
+        # Lock-free: the subscriber tuple is replaced, never mutated; no state changes here.
+        self._notify(ts_s, new_event, prev_event, source)
 
 
 # ====== SINGLETON ======
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import logging
 from functools import lru_cache
 from typing import List, Tuple, cast
 
@@ -10,6 +11,13 @@ import numpy as np
 import scipy.signal as signal
 
 from utils.logger import get_logger
+from utils.jit import NUMBA_AVAILABLE, njit
+
+# scipy's Cython SOS kernel (private; used directly by _sosfilt when importable).
+try:
+    from scipy.signal._sosfilt import _sosfilt as _scipy_sosfilt_kernel
+except Exception:
+    _scipy_sosfilt_kernel = None
 
 logger = get_logger(__name__)
 
@@ -18,44 +26,201 @@ logger = get_logger(__name__)
 SOSArray = np.ndarray  # shape: (n_sections, 6), SciPy SOS (Second-Order Sections) format
 
 
+# ====== SOS KERNEL (JIT WHEN AVAILABLE) ======
+@njit(cache=True, nogil=True)
+def _sos_step(sos, zi, x):
+    """Filter one sample through an SOS cascade (DF-II transposed); updates zi in place.
+
+    Same recurrence and zi layout (n_sections, 2) as scipy.signal.sosfilt.
+    """
+    for s in range(sos.shape[0]):
+        y = sos[s, 0] * x + zi[s, 0]
+        zi[s, 0] = sos[s, 1] * x - sos[s, 4] * y + zi[s, 1]
+        zi[s, 1] = sos[s, 2] * x - sos[s, 5] * y
+        x = y
+    return x
+
+
+@njit(cache=True, nogil=True)
+def _sos_block(sos, zi, x):
+    """Filter a 1-D block through one SOS cascade; NaN samples pass through without touching zi."""
+    out = np.empty_like(x)
+    for n in range(x.shape[0]):
+        v = x[n]
+        if v != v:
+            out[n] = v
+            continue
+        for s in range(sos.shape[0]):
+            y = sos[s, 0] * v + zi[s, 0]
+            zi[s, 0] = sos[s, 1] * v - sos[s, 4] * y + zi[s, 1]
+            zi[s, 1] = sos[s, 2] * v - sos[s, 5] * y
+            v = y
+        out[n] = v
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _sos_block_2d(sos, zi, x):
+    """Filter an (n, F) block column-wise through one SOS cascade; zi is (n_sections, 2, F).
+
+    Per-element NaN pass-through as in _sos_block; one native call covers all channels.
+    """
+    out = np.empty_like(x)
+    for c in range(x.shape[1]):
+        for n in range(x.shape[0]):
+            v = x[n, c]
+            if v != v:
+                out[n, c] = v
+                continue
+            for s in range(sos.shape[0]):
+                y = sos[s, 0] * v + zi[s, 0, c]
+                zi[s, 0, c] = sos[s, 1] * v - sos[s, 4] * y + zi[s, 1, c]
+                zi[s, 1, c] = sos[s, 2] * v - sos[s, 5] * y
+                v = y
+            out[n, c] = v
+    return out
+
+
+def _sos_step_py(coefs, zi, x):
+    """Interpreted twin of _sos_step on plain floats (scalar path when numba is missing).
+
+    coefs: per-section (b0, b1, b2, a0, a1, a2) tuples; zi: per-section [z0, z1] lists,
+    updated in place. No arrays are built, unlike a one-sample scipy.signal.sosfilt call.
+    """
+    for (b0, b1, b2, _a0, a1, a2), z in zip(coefs, zi):
+        y = b0 * x + z[0]
+        z[0] = b1 * x - a1 * y + z[1]
+        z[1] = b2 * x - a2 * y
+        x = y
+    return x
+
+
+def _sosfilt(sos, x, zi):
+    """signal.sosfilt(sos, x, axis=0, zi=zi) for a 1-D or (n, F) float64 block; returns (y, zf).
+
+    Calls scipy's Cython kernel directly when available, skipping sosfilt's per-call
+    shape/dtype validation. sos must be C-contiguous float64 and writeable (our own
+    stacked copy); x and zi are copied, never modified.
+    """
+    if _scipy_sosfilt_kernel is None:
+        return signal.sosfilt(sos, x, axis=0, zi=zi)
+    if x.ndim == 1:
+        y = np.array(x[None, :], dtype=np.float64, order="C")                  # (1, n)
+        zf = np.array(zi[None], dtype=np.float64, order="C")                    # (1, n_sections, 2)
+        _scipy_sosfilt_kernel(sos, y, zf)
+        return y[0], zf[0]
+    y = np.array(x.T, dtype=np.float64, order="C")                              # (F, n)
+    zf = np.array(np.moveaxis(zi, 2, 0), dtype=np.float64, order="C")           # (F, n_sections, 2)
+    _scipy_sosfilt_kernel(sos, y, zf)
+    return y.T, np.moveaxis(zf, 0, 2)
+
+
+_KERNEL_WARM = False
+
+
+def _warm_kernel() -> None:
+    """Compile (or load from cache) the SOS kernel before the first realtime sample."""
+    global _KERNEL_WARM
+    if _KERNEL_WARM or not NUMBA_AVAILABLE:
+        return
+    sos = np.array([[1.0, 0.0, 0.0, 1.0, 0.0, 0.0]])
+    _sos_step(sos, np.zeros((1, 2)), 0.0)
+    _sos_block(sos, np.zeros((1, 2)), np.zeros(1))
+    _sos_block_2d(sos, np.zeros((1, 2, 1)), np.zeros((1, 1)))
+    _KERNEL_WARM = True
+
+
 # ====== STREAMING FILTER (STATEFUL) ======
+def _unit_step_zi(sos_chain: List[SOSArray]) -> np.ndarray:
+    """Steady-state zi of the fused cascade for a unit step input: (n_sections, 2).
+
+    Scaling by the first sample primes the filter as if that value had always been
+    present, which removes the start-up transient of a zero state. Zeros if the
+    design has no steady state (sosfilt_zi fails).
+    """
+    fused = np.vstack(sos_chain)
+    try:
+        return np.asarray(signal.sosfilt_zi(fused), dtype=np.float64)
+    except Exception as e:
+        logger.warning("sosfilt_zi failed (%s); filters start from zero state", e)
+        return np.zeros((fused.shape[0], 2))
+
+
 class StreamingSOS:
-    """Stateful streaming SOS filter chain for realtime single-sample processing."""
+    """Stateful streaming SOS filter chain for realtime single-sample processing.
+
+    The stages are fused into one cascade (sections stacked in order), so a sample
+    or block is a single kernel call however many stages the design has.
+    """
     def __init__(self, sos_chain: List[SOSArray], context: str | None = None):
         """Build with a list of SOS stages; empty list means identity."""
-        self._sos_chain: List[SOSArray] = list(sos_chain)
-        self._zi_chain: List[np.ndarray] = [
-            signal.sosfilt_zi(sos) * 0.0 for sos in self._sos_chain
-        ]
+        # Running stage after stage equals running their stacked sections in order;
+        # a contiguous float64 copy keeps the JIT kernel on a single specialization.
+        self._sos: SOSArray | None = (
+            np.ascontiguousarray(np.vstack(sos_chain), dtype=np.float64) if sos_chain else None
+        )
+        self._zi: np.ndarray = self._zero_state()
+        # Unit-step steady state; scaled by the first finite sample on first use, see _prime().
+        self._zi_unit = _unit_step_zi(sos_chain) if self._sos is not None else None
+        self._primed = False
         self._ctx = str(context) if context else ""  # Optional 'dev:ch' tag
-        # Log concise init with stage count and optional context tag.
+        self._use_jit = NUMBA_AVAILABLE and self._sos is not None  # Else float-list scalar path
+        if self._use_jit:
+            _warm_kernel()
+        elif self._sos is not None:
+            # Without numba, apply() runs _sos_step_py on Python floats; its state (_zi_py) is
+            # authoritative for that path and is mirrored to/from _zi by apply_block().
+            self._coefs = [tuple(row) for row in self._sos.tolist()]
+            self._zi_py = self._zi.tolist()
+        # Log concise init with stage/section count and optional context tag.
         logger.info(
-            "StreamingSOS init: stages=%d%s",
-            len(self._sos_chain),
+            "StreamingSOS init: stages=%d, sections=%d, kernel=%s%s",
+            len(sos_chain), (0 if self._sos is None else self._sos.shape[0]),
+            "numba" if self._use_jit else "python",
             (f", ctx={self._ctx}" if self._ctx else "")
         )
 
+    def _zero_state(self) -> np.ndarray:
+        """Zeroed zi in sosfilt's layout: (n_sections, 2)."""
+        n_sec = 0 if self._sos is None else self._sos.shape[0]
+        return np.zeros((n_sec, 2))
+
+    def _set_state(self, zi: np.ndarray) -> None:
+        """Install the fused zi array (and the float-list mirror on the non-JIT path)."""
+        self._zi = zi
+        if not self._use_jit:
+            self._zi_py = zi.tolist()
+
     def reset(self) -> None:
-        """Reset internal states (zi) to zero without changing the topology."""
-        self._zi_chain = [signal.sosfilt_zi(sos) * 0.0 for sos in self._sos_chain]
+        """Reset internal states (zi) without changing the topology; re-primes on the next sample."""
+        self._set_state(self._zero_state())
+        self._primed = False
         if self._ctx:
             logger.info("StreamingSOS state reset (ctx=%s)", self._ctx)
         else:
             logger.info("StreamingSOS state reset")
 
+    def _prime(self, x0: float) -> None:
+        """Set zi to the steady state for a constant input x0 (first finite sample)."""
+        self._set_state(self._zi_unit * x0)
+        self._primed = True
+
     def apply(self, x: float) -> float:
-        """Filter a single sample through the chain; NaN passes through unchanged."""
-        if not self._sos_chain:
+        """Filter a single sample through the chain; NaN passes through unchanged.
+
+        A float input always yields a float (identity, NaN and error paths included).
+        """
+        if self._sos is None:
             return x
-        if isinstance(x, float) and np.isnan(x):
+        if x != x:                             # IEEE-754 NaN test, no ufunc call
             return x
         y = float(x)
+        if not self._primed:
+            self._prime(y)
         try:
-            for i, sos in enumerate(self._sos_chain):
-                y_arr, zi_next = signal.sosfilt(sos, [y], zi=self._zi_chain[i])
-                y = float(y_arr[0])
-                self._zi_chain[i] = zi_next
-            return y
+            if self._use_jit:
+                return _sos_step(self._sos, self._zi, y)        # zi updated in place; GIL released
+            return _sos_step_py(self._coefs, self._zi_py, y)    # Same recurrence on plain floats
         except Exception as e:
             # Fail-safe: surface error and pass-through the raw sample.
             if self._ctx:
@@ -64,6 +229,130 @@ class StreamingSOS:
                 logger.error("StreamingSOS apply failed: %s", e)
             return x
 
+    def apply_block(self, x: np.ndarray) -> np.ndarray:
+        """Filter a 1-D block of consecutive samples; same semantics as repeated apply().
+
+        Returns a new float64 array. NaN samples pass through and do not advance state.
+        """
+        # Read-only view when x is already contiguous float64: both kernels write a fresh
+        # output, so a defensive copy is only needed where a path writes into y itself.
+        y = np.ascontiguousarray(x, dtype=np.float64)
+        sos = self._sos
+        if sos is None or y.size == 0:
+            return y.copy() if y is x else y
+        if not self._primed:
+            finite_idx = np.flatnonzero(~np.isnan(y))
+            if finite_idx.size:
+                self._prime(float(y[finite_idx[0]]))
+        try:
+            if self._use_jit:
+                return _sos_block(sos, self._zi, y)
+            zi = np.array(self._zi_py)          # Scalar-path state -> array
+            finite = ~np.isnan(y)
+            if finite.all():
+                y, zi = _sosfilt(sos, y, zi)
+            else:
+                # Gaps: filter only the finite samples so NaNs do not poison the state
+                y = y.copy()
+                y[finite], zi = _sosfilt(sos, y[finite], zi)
+            self._set_state(zi)
+            return y
+        except Exception as e:
+            # Fail-safe: surface error and pass-through the raw block.
+            if self._ctx:
+                logger.error("StreamingSOS apply_block failed (ctx=%s): %s", self._ctx, e)
+            else:
+                logger.error("StreamingSOS apply_block failed: %s", e)
+            return np.array(x, dtype=np.float64)
+
+
+class StreamingSOSBank:
+    """Stateful SOS chain shared by F parallel channels, filtered block-wise.
+
+    Equivalent to F independent StreamingSOS instances on the same design. The
+    stages are fused into one cascade (sections stacked in order) with state
+    (n_sections, 2, F), so a chunk of all channels is one kernel or one
+    signal.sosfilt(axis=0) call.
+    """
+    def __init__(self, sos_chain: List[SOSArray], n_channels: int, context: str | None = None):
+        """Build with a list of SOS stages (empty → identity) for n_channels columns."""
+        # Running stage after stage equals running their stacked sections in order.
+        self._sos: SOSArray | None = (
+            np.ascontiguousarray(np.vstack(sos_chain), dtype=np.float64) if sos_chain else None
+        )
+        self._n = int(n_channels)
+        self._zi = self._zero_state()
+        # Unit-step steady state; each column is primed with its own first finite sample.
+        self._zi_unit = _unit_step_zi(sos_chain) if self._sos is not None else None
+        self._primed = np.zeros(self._n, dtype=bool)
+        self._ctx = str(context) if context else ""  # Optional 'dev:group' tag
+        self._use_jit = NUMBA_AVAILABLE and self._sos is not None  # Else scipy path
+        if self._use_jit:
+            _warm_kernel()
+        logger.info(
+            "StreamingSOSBank init: stages=%d, sections=%d, channels=%d, kernel=%s%s",
+            len(sos_chain), (0 if self._sos is None else self._sos.shape[0]), self._n,
+            "numba" if self._use_jit else "scipy",
+            (f", ctx={self._ctx}" if self._ctx else "")
+        )
+
+    def _zero_state(self) -> np.ndarray:
+        """Zeroed zi in sosfilt's axis=0 layout: (n_sections, 2, F)."""
+        n_sec = 0 if self._sos is None else self._sos.shape[0]
+        return np.zeros((n_sec, 2, self._n))
+
+    def reset(self) -> None:
+        """Reset internal states (zi) without changing the topology; columns re-prime."""
+        self._zi = self._zero_state()
+        self._primed[:] = False
+        if self._ctx:
+            logger.info("StreamingSOSBank state reset (ctx=%s)", self._ctx)
+        else:
+            logger.info("StreamingSOSBank state reset")
+
+    def _prime_columns(self, y: np.ndarray) -> None:
+        """Prime each not-yet-primed column from its first finite sample in this block."""
+        finite = ~np.isnan(y)
+        for c in np.flatnonzero(~self._primed & finite.any(axis=0)).tolist():
+            x0 = y[int(np.argmax(finite[:, c])), c]
+            self._zi[:, :, c] = self._zi_unit * x0
+            self._primed[c] = True
+
+    def apply_block(self, x: np.ndarray) -> np.ndarray:
+        """Filter an (n, F) block (rows = consecutive samples, columns = channels).
+
+        Returns a new float64 array. NaN samples pass through and do not advance
+        the state of their channel.
+        """
+        y = np.ascontiguousarray(x, dtype=np.float64)   # No copy when already C float64
+        sos = self._sos
+        if sos is None or y.size == 0:
+            return y.copy() if y is x else y
+        if not self._primed.all():
+            self._prime_columns(y)
+        try:
+            if self._use_jit:
+                return _sos_block_2d(sos, self._zi, y)
+            finite = ~np.isnan(y)
+            if finite.all():
+                # Common case: every channel in one C call
+                y, self._zi = _sosfilt(sos, y, self._zi)
+                return y
+            # Gaps: per column, filtering only finite samples so NaNs do not poison the state
+            y = y.copy()
+            for c in range(self._n):
+                col = y[:, c]
+                ok = finite[:, c]
+                col[ok], self._zi[:, :, c] = _sosfilt(sos, col[ok], self._zi[:, :, c])
+            return y
+        except Exception as e:
+            # Fail-safe: surface error and pass-through the raw block.
+            if self._ctx:
+                logger.error("StreamingSOSBank apply_block failed (ctx=%s): %s", self._ctx, e)
+            else:
+                logger.error("StreamingSOSBank apply_block failed: %s", e)
+            return np.array(x, dtype=np.float64)
+
 
 # ====== SOS DESIGN (STATELESS, CACHED) ======
 # --- Internal: normalize spec dict into primitives (with defaults) ---
@@ -105,7 +394,6 @@ def _parse_spec(
 
 @lru_cache(maxsize=128)
 def _design_sos_cached(
-    sensor_key: str,
     fs_hz: float,
     bp_enable: bool,
     bp_order: int,
@@ -114,10 +402,11 @@ def _design_sos_cached(
     notch: int,
     notch_q: float,
 ) -> Tuple[SOSArray, ...]:
-    """Cached SOS designer. Keyed only by primitives for deterministic reuse.
+    """Cached SOS designer. Keyed only by filter primitives (no sensor/device name),
+    so every device instance with the same fs and spec shares one design.
 
     Returns a tuple of SOS arrays, one per stage (e.g., (notch_sos, bp_sos)).
-    Empty tuple means identity (no filtering).
+    Empty tuple means identity (no filtering). Arrays are shared: treat as read-only.
     """
     stages: List[SOSArray] = []
 
@@ -128,7 +417,7 @@ def _design_sos_cached(
             sos_notch = cast(SOSArray, signal.tf2sos(b, a))   # type: ignore[assignment]
             stages.append(sos_notch)
         except Exception as e:
-            logger.error("design_sos: notch failed (sensor=%s): %s", sensor_key, e)
+            logger.error("design_sos: notch failed (fs=%.3f, notch=%d): %s", fs_hz, notch, e)
 
     # Optional band-pass
     if bp_enable:
@@ -138,12 +427,30 @@ def _design_sos_cached(
             ))
             stages.append(sos_bp)
         except Exception as e:
-            logger.error("design_sos: bandpass failed (sensor=%s): %s", sensor_key, e)
+            logger.error("design_sos: bandpass failed (fs=%.3f, band=%.3f-%.3f): %s", fs_hz, low_hz, high_hz, e)
 
     # Return immutable tuple to satisfy cache requirements.
     return tuple(stages)
 
 
+@lru_cache(maxsize=128)
+def _summarize(
+    bp_enable: bool,
+    bp_order: int,
+    low_hz: float,
+    high_hz: float,
+    notch: int,
+    notch_q: float,
+) -> str:
+    """Short description of a validated design, e.g. 'notch=50Hz(Q=30.0), bp=on[...]'."""
+    parts: List[str] = []
+    if notch in (50, 60):
+        parts.append(f"notch={notch}Hz(Q={notch_q:.1f})")
+    if bp_enable:
+        parts.append(f"bp=on[{low_hz:.2f}-{high_hz:.2f} Hz, ord={bp_order}]")
+    return ", ".join(parts) if parts else "identity"
+
+
 def design_sos(sensor_key: str, fs_hz: float, spec: dict) -> List[SOSArray]:
     """Design a list of SOS stages for a sensor using a spec dict.
 
@@ -153,28 +460,17 @@ def design_sos(sensor_key: str, fs_hz: float, spec: dict) -> List[SOSArray]:
     # Normalize and validate the spec to primitives suitable for caching.
     bp_enable, bp_order, low_hz, high_hz, notch, notch_q = _parse_spec(fs_hz, spec)
 
-    # Delegate to the cached designer; convert tuple → list for callers.
+    # Delegate to the cached designer (primitives are already typed by _parse_spec);
+    # convert tuple → list for callers.
     sos_tuple = _design_sos_cached(
-        sensor_key,
-        float(fs_hz),
-        bool(bp_enable),
-        int(bp_order),
-        float(low_hz),
-        float(high_hz),
-        int(notch),
-        float(notch_q),
+        float(fs_hz), bp_enable, bp_order, low_hz, high_hz, notch, notch_q,
     )
 
-    # Build human-readable summary before returning.
-    try:
-        parts: List[str] = []
-        if notch in (50, 60):
-            parts.append(f"notch={notch}Hz(Q={notch_q:.1f})")
-        if bp_enable:
-            parts.append(f"bp=on[{low_hz:.2f}-{high_hz:.2f} Hz, ord={bp_order}]")
-        summary = ", ".join(parts) if parts else "identity"
-        logger.info("design_sos: sensor=%s → %s", sensor_key, summary)
-    except Exception:
-        pass
+    # Human-readable summary, only when INFO is on; memoized per primitives.
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "design_sos: sensor=%s → %s", sensor_key,
+            _summarize(bp_enable, bp_order, low_hz, high_hz, notch, notch_q),
+        )
 
     return [s for s in sos_tuple]
@@ -2,7 +2,8 @@
 # Non-sticky spike bus: one-shot notifications with keymap triggers (thread-safe).
 
 from __future__ import annotations
-from typing import Callable, Dict, Optional, List, Tuple
+from typing import Callable, Dict, Optional, Tuple
+import sys
 import threading
 import time
 
@@ -17,6 +18,11 @@ logger = get_logger(__name__)
 Subscriber = Callable[[float, str, str], None]
 
 
+def _ignore_trigger(*_args, **_kwargs) -> None:
+    """Stand-in for trigger methods when triggers are disabled (see __init__)."""
+    return None
+
+
 # ====== SPIKE BUS ======
 class SpikeBus:
     """One-shot spike notifications with thread-safe broadcasting.
@@ -38,8 +44,9 @@ class SpikeBus:
         else:
             self._enabled = bool(enabled)
 
-        # Defensive copy prevents external mutations from affecting the bus.
-        self._keymap = dict(keymap)
+        # Defensive copy prevents external mutations from affecting the bus;
+        # interned keys/labels keep lookups on the identity fast path.
+        self._keymap = {sys.intern(str(k)): sys.intern(str(v)) for k, v in keymap.items()}
 
         # Log available spike labels once at startup (compact summary).
         try:
@@ -48,10 +55,15 @@ class SpikeBus:
         except Exception:
             pass  # Keep construction robust if keymap is malformed
 
-        # Subscribers container and re-entrant lock for thread safety.
-        self._subs: List[Subscriber] = []
+        # Subscribers (copy-on-write tuple: emitters iterate it without the lock)
+        # and lock serializing subscribe().
+        self._subs: Tuple[Subscriber, ...] = ()
         self._lock = threading.Lock()
 
+        # Disabled: bind the triggers to a no-op once, so calls skip lookups and logging.
+        if not self._enabled:
+            self.set_by_key = self.set_spike = _ignore_trigger  # type: ignore[method-assign]
+
         logger.info("SpikeBus ready: enabled=%s", self._enabled)
 
     # --- Query (parity only; spikes have no sticky state) ---
@@ -64,34 +76,24 @@ class SpikeBus:
     def subscribe(self, fn: Subscriber) -> None:
         """Register a subscriber for spike notifications."""
         with self._lock:
-            self._subs.append(fn)
+            self._subs = self._subs + (fn,)   # Publish a new tuple; readers keep their snapshot
             logger.info("SpikeBus: subscriber added (n=%d)", len(self._subs))  # Count helps debugging wiring
 
     # --- Triggers (keyboard/API) ---
     def set_by_key(self, key: str, source: str = "keyboard") -> None:
         """Fire a spike mapped from `key` (no toggle, non-sticky)."""
-        if not self._enabled:
-            logger.warning("SpikeBus: ignored key='%s' (triggers disabled)", key)
-            return
         name = self._keymap.get(key)
         if name is None:
             logger.warning("SpikeBus: unmapped spike key='%s'", key)
             return
-        # Mirror EventBus: compute target and delegate to the common setter.
-        with self._lock:
-            target = name  # no toggle for spikes
-        self.set_spike(target, source=source)
+        # No toggle for spikes (and no state to read): delegate to the common setter.
+        self.set_spike(name, source=source)
 
     def set_spike(self, name: str, source: str = "api") -> None:
         """Emit a spike 'now' with monotonic timestamp (non-sticky)."""
-        if not self._enabled:
-            logger.warning("SpikeBus: ignored spike='%s' (triggers disabled)", name)
-            return
         now = time.monotonic()
-        # Snapshot subscribers under lock; notify out of the lock (like EventBus).
-        with self._lock:
-            subs = list(self._subs)
-        for fn in subs:
+        # Lock-free broadcast: the subscriber tuple is replaced, never mutated.
+        for fn in self._subs:
             try:
                 fn(now, name, source)
             except Exception as e:
@@ -108,12 +110,8 @@ class SpikeBus:
         Use when an externally-quantized timestamp is available and must
         be preserved. No sticky state is updated (there is none).
         """
-        # Snapshot subscribers; no shared state mutation occurs here.
-        with self._lock:
-            subs = list(self._subs)
-
-        # Notify out of the lock for safety and responsiveness.
-        for fn in subs:
+        # Lock-free broadcast over the current subscriber tuple; no shared state mutation.
+        for fn in self._subs:
             try:
                 fn(float(ts_s), new_spike, source)
             except Exception as e:
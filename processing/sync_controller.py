@@ -7,6 +7,7 @@ import threading
 import queue
 import time
 import math
+import numpy as np
 from dataclasses import dataclass
 from typing import Dict, Iterable, Tuple, List, Optional, Union
 from utils.config import CONFIG  # Read default event from events.EVENT_KEYMAP
@@ -34,6 +35,8 @@ class SyncManager:
 
     Sample packet (producer → sync):
       (device_ts: float, device_name: str, channel_pairs: Tuple[(str, float|None), ...])  # accept None
+    Columnar packet (producer → sync, one per chunk):
+      (device_ts: ndarray (n,), device_name: str, channel_names: Tuple[str, ...], values: ndarray (n, K), gaps: ndarray (n, K) bool | None)
 
     Sink packet (sync → sinks), tagged:
       ("sample", k, t_q, device, ((ch,val), ...))
@@ -186,8 +189,40 @@ class SyncManager:
 
         Drop-oldest policy applies only when max_queue > 0 and the queue is full.
         """
-        pkt = (float(device_ts), str(device_name), tuple(channel_pairs))
+        self._put_packet((float(device_ts), str(device_name), tuple(channel_pairs)))
 
+    def enqueue_packet_fast(
+        self,
+        device_ts: float,
+        device_name: str,
+        channel_pairs: Tuple[Tuple[str, NumberOrNone], ...],
+        /,
+    ) -> None:
+        """Positional hot-path variant of enqueue_packet (no coercion, no copy).
+
+        Caller guarantees float ts, str name and an immutable tuple of pairs.
+        """
+        self._put_packet((device_ts, device_name, channel_pairs))
+
+    def enqueue_columnar(
+        self,
+        device_name: str,
+        device_ts: np.ndarray,
+        channel_names: Tuple[str, ...],
+        values: np.ndarray,
+        gaps: Optional[np.ndarray] = None,
+        /,
+    ) -> None:
+        """Enqueue a chunk as arrays: ts (n,), values (n, K) float64, optional gaps (n, K) bool.
+
+        Cells flagged in gaps are emitted as None. Conversion to Python rows happens
+        on the consumer thread, so the producer does no per-sample work. The arrays
+        are referenced, not copied: the caller must not write to them afterwards.
+        """
+        self._put_packet((device_ts, device_name, channel_names, values, gaps))
+
+    def _put_packet(self, pkt: tuple) -> None:
+        """Queue a built packet; drop-oldest when bounded and full."""
         # Implement drop-oldest when bounded queue is full (non-blocking).
         if self._max_queue > 0:
             try:
@@ -321,7 +356,10 @@ class SyncManager:
             if pkt is None:
                 break
             try:
-                self._handle_sample_packet(pkt)
+                if len(pkt) == 5:
+                    self._handle_columnar_packet(pkt)
+                else:
+                    self._handle_sample_packet(pkt)
             except Exception as e:
                 # Best-effort: skip malformed packet without stopping the loop
                 logger.error("Sync: failed to handle packet: %s", e)
@@ -348,6 +386,28 @@ class SyncManager:
         payload = ("sample", k, t_q, device_name, tuple(pairs))
         self._emit_to_sinks(payload)
 
+    def _handle_columnar_packet(self, pkt: tuple) -> None:
+        """Expand a columnar chunk (ts, device, names, values, gaps) into per-sample payloads."""
+        device_ts, device_name, names, values, gaps = pkt
+        if not isinstance(device_name, str):
+            raise TypeError("device_name must be str")
+        if len(device_ts) != len(values):
+            raise ValueError("Block must carry one timestamp per row")
+
+        # One bulk conversion to Python rows; gap cells become None
+        rows = values.tolist()
+        if gaps is not None:
+            for r in np.flatnonzero(gaps.any(axis=1)).tolist():
+                rows[r] = [None if g else v for v, g in zip(rows[r], gaps[r].tolist())]
+
+        map_to_host = self._map_to_host
+        quantize = self._quantize
+        emit = self._emit_to_sinks
+        for ts, vals in zip(device_ts.tolist(), rows):
+            # Same mapping/quantization as a single sample packet
+            k, t_q = quantize(map_to_host(device_name, ts))
+            emit(("sample", k, t_q, device_name, tuple(zip(names, vals))))
+
     def _decimals_from_delta(self, delta: float) -> int:
         """
         Compute decimal digits for visual/serialization based on delta.
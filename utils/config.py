@@ -52,12 +52,14 @@ _DEFAULT_CONFIG: Dict[str, Any] = {
         "FLUSH_PERIOD_SEC": 0.5,    # Periodic flush to disk
         "FLUSH_ROWS": 0,            # 0 means "auto" = min(2048, max(64, round(fs_max * FLUSH_PERIOD_SEC)))
                                     # Alternative limit for flushing
+        "FLUSH_ON_PERIOD": False,   # True: also force buffered CSV data to the OS on each period/row trigger
         "IDLE_WATERMARK_SEC": 1,    # If no data –from every source– for this long, flush and close without explicit stop
 
         # Output directories (filenames include a single session timestamp)
         "OUT": {
             "SYNCED_DIR": "data/synced",
             "MARKERS_DIR": "data/markers",
+            "SYNCED_FORMAT": "csv",  # "csv" | "parquet" | "feather" (columnar formats need pyarrow)
         },
 
         # k is integer sample index in fs_max grid.
@@ -202,8 +204,8 @@ _DEFAULT_CONFIG: Dict[str, Any] = {
                         "STREAM_NAME": "EEG",         # MATCH THE UNICORN UTILITY
                         "STREAM_TYPE": "EEG",         # Or "Data" if utility publishes a combined stream
                         "RESOLVE_TIMEOUT_S": 5.0,
-                        "INLET_CHUNK_LEN": 0,         # 0 = source-controlled chunking
-                        "INLET_MAX_BUF_S": 10.0,
+                        "INLET_CHUNK_LEN": 0,         # Max samples per pull; 0 = auto, max(8, fs/50)
+                        "INLET_MAX_BUF_S": 1.0,       # Inlet backlog cap (s, >= 1); bounds catch-up latency
 
                         # Assumes EEG are the first 8 channels in a 17-ch "Data" stream.
                         "EEG_INDEXES": [0, 1, 2, 3, 4, 5, 6, 7],
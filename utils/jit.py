@@ -0,0 +1,34 @@
+# utils/jit.py
+# Optional Numba JIT: real @njit when numba is importable, transparent no-op otherwise.
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+"""
+Thin wrapper around numba.njit so hot kernels can be written once as plain
+Python loops. numba is an optional dependency: without it the decorated
+functions run as regular Python and callers may pick a NumPy path instead
+(check NUMBA_AVAILABLE).
+"""
+
+try:
+    from numba import njit as _numba_njit
+    NUMBA_AVAILABLE = True
+except Exception:  # ImportError or a broken llvmlite install
+    _numba_njit = None
+    NUMBA_AVAILABLE = False
+
+
+# ====== PUBLIC API ======
+def njit(*args: Any, **kwargs: Any) -> Any:
+    """Drop-in for numba.njit; returns the function unchanged when numba is missing."""
+    if NUMBA_AVAILABLE:
+        return _numba_njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]  # Bare @njit usage
+
+    def _identity(fn: Callable[..., Any]) -> Callable[..., Any]:
+        return fn  # @njit(...) usage with options
+
+    return _identity